@@ -3,7 +3,7 @@ API v1 Router
 """
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, projects, deployments, logs
+from app.api.v1.endpoints import auth, projects, deployments, logs, metrics
 
 api_router = APIRouter()
 
@@ -29,3 +29,9 @@ api_router.include_router(
     prefix="/logs",
     tags=["logs"]
 )
+
+api_router.include_router(
+    metrics.router,
+    prefix="/metrics",
+    tags=["metrics"]
+)
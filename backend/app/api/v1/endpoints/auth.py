@@ -3,7 +3,7 @@ Authentication Endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
 
 from app.core.dependencies import get_db
@@ -15,7 +15,7 @@ router = APIRouter()
 
 
 @router.post("/signup", response_model=schemas.Token, status_code=status.HTTP_201_CREATED)
-def signup(user_data: schemas.UserSignup, db: Session = Depends(get_db)):
+async def signup(user_data: schemas.UserSignup, db: AsyncSession = Depends(get_db)):
     """
     Create new user account
     
@@ -27,7 +27,7 @@ def signup(user_data: schemas.UserSignup, db: Session = Depends(get_db)):
         JWT access token
     """
     # Create user
-    new_user = AuthService.create_user(db, user_data)
+    new_user = await AuthService.create_user(db, user_data)
     
     # Generate token
     access_token = AuthService.create_token_for_user(new_user)
@@ -36,7 +36,7 @@ def signup(user_data: schemas.UserSignup, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(user_data: schemas.UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: schemas.UserLogin, db: AsyncSession = Depends(get_db)):
     """
     Login with email and password
     
@@ -51,7 +51,7 @@ def login(user_data: schemas.UserLogin, db: Session = Depends(get_db)):
         HTTPException: If credentials are invalid
     """
     # Authenticate user
-    user = AuthService.authenticate_user(db, user_data.email, user_data.password)
+    user = await AuthService.authenticate_user(db, user_data.email, user_data.password)
     
     if not user:
         raise HTTPException(
@@ -83,7 +83,7 @@ async def login_github():
 
 
 @router.get("/auth/github/callback")
-async def auth_github_callback(code: str, db: Session = Depends(get_db)):
+async def auth_github_callback(code: str, db: AsyncSession = Depends(get_db)):
     """
     GitHub OAuth callback
     
@@ -137,7 +137,7 @@ async def auth_github_callback(code: str, db: Session = Depends(get_db)):
             )
 
     # Create or update user
-    user = AuthService.create_or_update_oauth_user(
+    user = await AuthService.create_or_update_oauth_user(
         db=db,
         email=primary_email,
         provider="github",
@@ -174,7 +174,7 @@ async def login_google():
 
 
 @router.get("/auth/google/callback")
-async def auth_google_callback(code: str, db: Session = Depends(get_db)):
+async def auth_google_callback(code: str, db: AsyncSession = Depends(get_db)):
     """
     Google OAuth callback
     
@@ -221,7 +221,7 @@ async def auth_google_callback(code: str, db: Session = Depends(get_db)):
             )
 
     # Create or update user
-    user = AuthService.create_or_update_oauth_user(
+    user = await AuthService.create_or_update_oauth_user(
         db=db,
         email=email,
         provider="google",
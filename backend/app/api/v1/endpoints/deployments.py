@@ -2,12 +2,15 @@
 Deployment Endpoints
 """
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_db, get_current_active_user
 from app.db import models, schemas
+from app.services.build_farm import DeploymentInProgress, build_farm
 from app.services.deployment_service import DeploymentService
 from app.services.project_service import ProjectService
+from app.services.runtime_service import restore_progress
+from app.utils.docker_client import docker_is_healthy
 
 router = APIRouter()
 
@@ -16,7 +19,7 @@ router = APIRouter()
 async def deploy_project(
     request: schemas.DeploymentCreate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """
@@ -30,13 +33,50 @@ async def deploy_project(
         
     Returns:
         Deployment status
+        
+    Raises:
+        HTTPException: If another user owns the project name, or the
+            project is already being deployed
     """
-    # Check if project name is available (single query)
+    # Health is checked in the background, no Docker round trip here
+    if not docker_is_healthy():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Docker daemon is unavailable, try again later"
+        )
+    
+    # Only accept builds the farm can start now, instead of queueing them unbounded
+    try:
+        admitted = build_farm.admit(request.project_id)
+    except DeploymentInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A deployment of this project is already in progress"
+        )
+    if not admitted:
+        retry_after = build_farm.retry_after()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"All build nodes are busy, retry in {retry_after} seconds",
+            headers={"Retry-After": str(retry_after)}
+        )
+    
+    # Create or update the project in one upsert. It returns nothing when
+    # another user owns the name: containers, nginx configs and domains are
+    # keyed by the bare name, so a name belongs to a single user.
     user_id = getattr(current_user, 'id')
-    existing_project = db.query(models.Project).filter(
-        models.Project.name == request.project_id,
-        models.Project.owner_id == user_id
-    ).first()
+    try:
+        started = await ProjectService.start_deploy(db, request.project_id, request.git_url, user_id)
+    except Exception:
+        build_farm.finish_deployment(request.project_id)
+        raise
+    if started is None:
+        build_farm.finish_deployment(request.project_id)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Project name is already taken"
+        )
+    project, created = started
     
     # Start deployment in background
     deployment_service = DeploymentService()
@@ -44,7 +84,9 @@ async def deploy_project(
         deployment_service.run_deployment,
         request.git_url,
         request.project_id,
-        user_id
+        user_id,
+        project.id,
+        created
     )
     
     return {
@@ -53,3 +95,19 @@ async def deploy_project(
         "project_id": request.project_id,
         "user_email": current_user.email
     }
+
+
+@router.get("/restore/progress")
+def get_restore_progress(
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Get progress of the startup container restoration
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        Restored/failed counts, percent done and container timing summary
+    """
+    return restore_progress.snapshot()
@@ -1,44 +1,37 @@
 """
 SSE (Server-Sent Events) endpoint for real-time deployment logs
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 import asyncio
 import json
 from typing import AsyncGenerator
 
-from app.core.dependencies import get_db
+from app.db.session import AsyncSessionLocal
 from app.db import models
 from app.services.deployment_service import DeploymentService
 
 router = APIRouter()
 
 
-async def log_stream(project_name: str, user_id: int, db: Session) -> AsyncGenerator[str, None]:
+async def log_stream(project_name: str, user_id: int, initial_status: str) -> AsyncGenerator[str, None]:
     """
     Stream deployment logs in real-time using SSE
+    
+    Reads in-memory logs and the status cache, so the stream holds no
+    database connection while it runs.
     """
     deployment_service = DeploymentService()
     last_position = 0
     max_retries = 450  # 450 * 2 seconds = 15 minutes max
     retries = 0
     
-    # Query project once at the start
-    project = db.query(models.Project).filter(
-        models.Project.name == project_name,
-        models.Project.owner_id == user_id
-    ).first()
-    
-    if not project:
-        yield f"data: {json.dumps({'type': 'error', 'message': 'Project not found'})}\n\n"
-        return
-    
     # Send initial connection success
     yield f"data: {json.dumps({'type': 'connected', 'message': 'Stream connected'})}\n\n"
     
     # Get initial status
-    last_status = project.status
+    last_status = initial_status
     
     while retries < max_retries:
         try:
@@ -51,10 +44,10 @@ async def log_stream(project_name: str, user_id: int, db: Session) -> AsyncGener
                     yield f"data: {json.dumps({'type': 'log', 'message': log})}\n\n"
                 last_position = len(logs)
             
-            # Get status from memory cache (no DB query)
-            status_cache = deployment_service.get_status(project_name)
-            current_status = status_cache.get('status', 'Building')
-            current_domain = status_cache.get('domain')
+            # Get status from the status cache (DB only on a miss)
+            status_entry = await deployment_service.get_status(project_name, user_id) or {}
+            current_status = status_entry.get('status', last_status)
+            current_domain = status_entry.get('domain')
             
             # Only send status update if changed
             if current_status != last_status:
@@ -93,8 +86,7 @@ async def log_stream(project_name: str, user_id: int, db: Session) -> AsyncGener
 @router.get("/stream/{project_name}")
 async def stream_deployment_logs(
     project_name: str,
-    token: str = Query(..., description="JWT token for authentication"),
-    db: Session = Depends(get_db)
+    token: str = Query(..., description="JWT token for authentication")
 ):
     """
     Stream deployment logs in real-time using Server-Sent Events
@@ -125,20 +117,25 @@ async def stream_deployment_logs(
     
     print(f"User ID: {user_id}, Project: {project_name}")
     
-    # Check if project exists and belongs to user
-    project = db.query(models.Project).filter(
-        models.Project.name == project_name,
-        models.Project.owner_id == user_id
-    ).first()
+    # Check if project exists and belongs to user. The session is closed
+    # before streaming starts so the stream does not pin a pooled connection.
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(models.Project.status).where(
+                models.Project.name == project_name,
+                models.Project.owner_id == user_id
+            )
+        )
+        project_status = result.scalar_one_or_none()
     
-    if not project:
+    if project_status is None:
         print(f"Project not found for user {user_id}")
         raise HTTPException(status_code=404, detail="Project not found")
     
     print(f"Starting SSE stream for project: {project_name}")
     
     return StreamingResponse(
-        log_stream(project_name, user_id, db),
+        log_stream(project_name, user_id, project_status),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
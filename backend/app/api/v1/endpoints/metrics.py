@@ -0,0 +1,40 @@
+"""
+Metrics Endpoints
+"""
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import get_current_active_user
+from app.db import models
+from app.db.pool import get_pool_stats
+from app.db.replica import read_router
+from app.services.build_farm import build_farm
+from app.services.nginx_service import nginx_reload_coordinator
+from app.services.principal_cache import principal_cache
+from app.services.runtime_service import runtime_reconciler
+from app.services.status_cache import status_cache
+from app.utils.password_hasher import password_hasher
+
+router = APIRouter()
+
+
+@router.get("/")
+def get_metrics(current_user: models.User = Depends(get_current_active_user)):
+    """
+    Get runtime metrics for the platform
+    
+    Args:
+        current_user: Current authenticated user
+        
+    Returns:
+        Metrics grouped by subsystem
+    """
+    return {
+        "nginx_reload": nginx_reload_coordinator.get_stats(),
+        "runtime": runtime_reconciler.get_stats(),
+        "build_farm": build_farm.get_stats(),
+        "db_pool": get_pool_stats(),
+        "db_replica": read_router.get_stats(),
+        "principal_cache": principal_cache.get_stats(),
+        "status_cache": status_cache.get_stats(),
+        "password_hashing": password_hasher.get_stats(),
+    }
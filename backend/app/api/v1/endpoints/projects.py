@@ -1,39 +1,119 @@
 """
 Project Management Endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+import asyncio
+import time
 
-from app.core.dependencies import get_db, get_current_active_user
+from app.core.dependencies import get_db, get_read_db, get_current_active_user
 from app.db import models, schemas
+from app.db.replica import read_router
+from app.services.build_farm import build_farm
 from app.services.project_service import ProjectService
+from app.services.nginx_service import edge_cache_stats
+from app.services.status_cache import status_cache
+from app.utils.change_notifier import status_changes
+from app.utils.etag import is_not_modified, make_etag, not_modified, set_etag
 
 router = APIRouter()
 
+# Fields that can be requested with ?fields=
+PROJECT_FIELDS = set(schemas.ProjectResponse.model_fields)
 
-@router.get("/", response_model=List[schemas.ProjectResponse])
-def list_projects(
-    db: Session = Depends(get_db),
+
+@router.get("/", response_model=List[schemas.ProjectSummary])
+async def list_projects(
+    request: Request,
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    framework: Optional[str] = None,
+    cursor: Optional[int] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size, all projects when omitted"),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. id,name,status"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """
-    Get all projects for the current user
+    Get projects for the current user
+    
+    When a page is full, the X-Next-Cursor header holds the cursor for
+    the next one. Responds 304 when If-None-Match matches the list's
+    ETag, without loading any project.
     
     Args:
+        request: Incoming request (for If-None-Match)
+        response: Outgoing response (for the cursor and ETag headers)
+        status_filter: Only projects with this status
+        framework: Only projects with this framework
+        cursor: Return projects after this cursor
+        limit: Page size
+        fields: Fields to return instead of the summary
         db: Database session
         current_user: Current authenticated user
         
     Returns:
         List of user's projects
+        
+    Raises:
+        HTTPException: If an unknown field is requested
     """
-    return ProjectService.get_user_projects(db, getattr(current_user, 'id'))
+    selected = None
+    if fields is not None:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = set(selected) - PROJECT_FIELDS
+        if unknown or not selected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}" if unknown else "No fields requested"
+            )
+    
+    user_id = getattr(current_user, 'id')
+    version = await ProjectService.get_user_projects_version(
+        db, user_id, status=status_filter, framework=framework
+    )
+    etag = make_etag("projects", user_id, request.url.query, *version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
+    projects = await ProjectService.get_user_projects(
+        db,
+        user_id,
+        status=status_filter,
+        framework=framework,
+        after_id=cursor,
+        limit=limit,
+        fields=selected
+    )
+    
+    headers = {}
+    if limit is not None and len(projects) == limit:
+        headers["X-Next-Cursor"] = str(projects[-1].id)
+    
+    if selected is None:
+        response.headers.update(headers)
+        set_etag(response, etag)
+        return projects
+    
+    response = JSONResponse(
+        content=jsonable_encoder([
+            {field: getattr(project, field) for field in selected}
+            for project in projects
+        ]),
+        headers=headers
+    )
+    set_etag(response, etag)
+    return response
 
 
 @router.post("/", response_model=schemas.ProjectResponse, status_code=status.HTTP_201_CREATED)
-def create_project(
+async def create_project(
     project_in: schemas.ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """
@@ -47,20 +127,102 @@ def create_project(
     Returns:
         Created project
     """
-    return ProjectService.create_project(db, project_in, getattr(current_user, 'id'))
+    return await ProjectService.create_project(db, project_in, getattr(current_user, 'id'))
+
+
+async def _collect_statuses(names: List[str], user_id: int) -> Tuple[List[dict], List[str], str]:
+    """
+    Current status of a user's projects
+    
+    Served from the status cache, projects it does not hold are read
+    from the database in a single query and cached.
+    
+    Returns:
+        (statuses, names not found, version of the statuses)
+    """
+    statuses = status_cache.get_owned(names, user_id)
+    
+    uncached = [name for name in names if name not in statuses]
+    if uncached:
+        async with read_router.session(user_id) as db:
+            stored = await ProjectService.get_project_statuses(db, user_id, uncached)
+        for name, entry in stored.items():
+            status_cache.fill(name, entry["status"], entry["domain"], user_id)
+        statuses.update(stored)
+    
+    projects = [
+        {
+            "name": name,
+            "status": statuses[name].get("status"),
+            "domain": statuses[name].get("domain"),
+            "queue_position": build_farm.queue_position(name),
+        }
+        for name in names if name in statuses
+    ]
+    missing = [name for name in names if name not in statuses]
+    version = make_etag(*(
+        f"{p['name']}={p['status']},{p['domain']},{p['queue_position']}" for p in projects
+    )).strip('"')
+    return projects, missing, version
+
+
+@router.post("/status:batch", response_model=schemas.ProjectStatusBatchResponse)
+async def get_project_statuses(
+    batch: schemas.ProjectStatusBatchRequest,
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Get status, domain and build queue position of many projects at once
+    
+    With `since` set to the version of a previous response and
+    `wait_seconds` > 0, the call long-polls: it returns as soon as any of
+    the projects changes, or after wait_seconds with the unchanged state.
+    
+    Args:
+        batch: Project names and long-poll options
+        current_user: Current authenticated user
+        
+    Returns:
+        Statuses of the user's projects, names that were not found and
+        the version to pass as `since` next time
+    """
+    user_id = getattr(current_user, 'id')
+    names = list(dict.fromkeys(batch.names))
+    deadline = time.monotonic() + batch.wait_seconds
+    
+    while True:
+        # Watch before reading so a change in between still wakes us
+        with status_changes.watch(names) as changed:
+            projects, missing, version = await _collect_statuses(names, user_id)
+            remaining = deadline - time.monotonic()
+            if batch.since is None or version != batch.since or remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(changed, remaining)
+            except asyncio.TimeoutError:
+                break
+    
+    return {"projects": projects, "missing": missing, "version": version}
 
 
 @router.get("/{project_id}", response_model=schemas.ProjectResponse)
-def get_project(
+async def get_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """
     Get a specific project by ID
     
+    Responds 304 when If-None-Match matches the project's ETag, checked
+    before the project (and its build logs) are loaded.
+    
     Args:
         project_id: Project ID
+        request: Incoming request (for If-None-Match)
+        response: Outgoing response (for the ETag header)
         db: Database session
         current_user: Current authenticated user
         
@@ -70,7 +232,20 @@ def get_project(
     Raises:
         HTTPException: If project not found
     """
-    project = ProjectService.get_project_by_id(db, project_id, getattr(current_user, 'id'))
+    user_id = getattr(current_user, 'id')
+    revision = await ProjectService.get_project_revision(db, project_id, user_id)
+    
+    if revision is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    etag = make_etag("project", project_id, revision)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
+    project = await ProjectService.get_project_by_id(db, project_id, user_id)
     
     if not project:
         raise HTTPException(
@@ -78,13 +253,15 @@ def get_project(
             detail="Project not found"
         )
     
+    # Tag what was actually loaded, the project may have changed meanwhile
+    set_etag(response, make_etag("project", project_id, project.revision))
     return project
 
 
 @router.get("/name/{project_name}", response_model=schemas.ProjectResponse)
-def get_project_by_name(
+async def get_project_by_name(
     project_name: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """
@@ -101,10 +278,13 @@ def get_project_by_name(
     Raises:
         HTTPException: If project not found
     """
-    project = db.query(models.Project).filter(
-        models.Project.name == project_name,
-        models.Project.owner_id == getattr(current_user, 'id')
-    ).first()
+    result = await db.execute(
+        select(models.Project).where(
+            models.Project.name == project_name,
+            models.Project.owner_id == getattr(current_user, 'id')
+        )
+    )
+    project = result.scalars().first()
     
     if not project:
         raise HTTPException(
@@ -116,16 +296,23 @@ def get_project_by_name(
 
 
 @router.get("/{project_id}/logs")
-def get_project_logs(
+async def get_project_logs(
     project_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """
     Get build logs for a specific project
     
+    Responds 304 when If-None-Match matches the project's ETag, checked
+    before the logs are loaded.
+    
     Args:
         project_id: Project ID
+        request: Incoming request (for If-None-Match)
+        response: Outgoing response (for the ETag header)
         db: Database session
         current_user: Current authenticated user
         
@@ -135,7 +322,58 @@ def get_project_logs(
     Raises:
         HTTPException: If project not found
     """
-    project = ProjectService.get_project_by_id(db, project_id, getattr(current_user, 'id'))
+    user_id = getattr(current_user, 'id')
+    revision = await ProjectService.get_project_revision(db, project_id, user_id)
+    
+    if revision is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    etag = make_etag("logs", project_id, revision)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    
+    result = await db.execute(
+        select(models.Project.build_logs, models.Project.revision).where(
+            models.Project.id == project_id,
+            models.Project.owner_id == user_id
+        )
+    )
+    row = result.first()
+    
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    set_etag(response, make_etag("logs", project_id, row.revision))
+    return {"logs": row.build_logs or "No logs available yet."}
+
+
+@router.get("/{project_id}/cache-stats")
+async def get_project_cache_stats(
+    project_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Get edge cache hit ratio for a specific project
+    
+    Args:
+        project_id: Project ID
+        db: Database session
+        current_user: Current authenticated user
+        
+    Returns:
+        Cache status counts and hit ratio
+        
+    Raises:
+        HTTPException: If project not found
+    """
+    project = await ProjectService.get_project_by_id(db, project_id, getattr(current_user, 'id'))
     
     if not project:
         raise HTTPException(
@@ -143,5 +381,5 @@ def get_project_logs(
             detail="Project not found"
         )
     
-    logs = getattr(project, 'build_logs', '')
-    return {"logs": logs or "No logs available yet."}
+    # Reads the log under a file lock, keep it off the event loop
+    return await asyncio.to_thread(edge_cache_stats.get_project_stats, str(project.name))
@@ -23,10 +23,28 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = "5432"
     POSTGRES_HOST: str = "localhost"
 
+    # Read Replica Settings (postgresql:// URL, reads stay on the primary when unset)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # Fall back to the primary beyond this lag
+    REPLICA_STICKY_SECONDS: float = 10.0  # Read your own writes from the primary for this long
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+
+    # Connection Pool Settings (per engine, the API and background work each have one)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 5.0  # Fail fast instead of queueing forever
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_PGBOUNCER_MODE: bool = False  # Behind a transaction pooler, no client-side pool
+
     # Security Settings
     SECRET_KEY: str = "super-secret-key-change-this"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = 12  # Existing hashes are upgraded on login when this changes
+    PASSWORD_HASH_WORKERS: int = 2  # Processes dedicated to bcrypt
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Hashes waiting beyond this are rejected with 503
+    PRINCIPAL_CACHE_SIZE: int = 10000  # Authenticated users cached per process
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0  # Bounds staleness across workers
 
     # CORS Settings
     BACKEND_CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:8000"]
@@ -46,6 +64,68 @@ class Settings(BaseSettings):
 
     # Deployment Settings
     HOST_PROJECTS_PATH: str = "D:/projects/vylos/projects"
+    HOST_RUNTIMES_PATH: str = "D:/projects/vylos/runtimes"
+    COMPRESSION_WORKERS: Optional[int] = None  # Defaults to CPU count
+    STATIC_ASSET_MAX_AGE: int = 300  # Seconds, for assets without a content hash
+
+    # Docker Settings
+    DOCKER_MAX_POOL_SIZE: int = 32
+    DOCKER_TIMEOUT_SECONDS: int = 60
+    DOCKER_HEALTH_CHECK_INTERVAL_SECONDS: float = 15.0
+    # TLS for tcp:// engines, same meaning as the docker CLI variables.
+    # DOCKER_CERT_PATH holds ca.pem, cert.pem and key.pem.
+    DOCKER_TLS_VERIFY: bool = False
+    DOCKER_CERT_PATH: Optional[str] = None
+
+    # Git Settings
+    GIT_CLONE_TIMEOUT_SECONDS: float = 300.0
+    GIT_CLONE_FILTER: Optional[str] = None  # e.g. "blob:none" for a partial clone
+    GIT_ALLOWED_PROTOCOLS: str = "https:http:ssh:git"
+
+    # Build Farm Settings
+    # Each node: {"name", "docker_host", "capacity", "shares_workspace", "cpus", "memory"}.
+    # Empty means builds run on the local engine only. Anyone who can reach a
+    # node's Engine API controls that host: use tcp:// only on a trusted
+    # network, otherwise enable DOCKER_TLS_VERIFY.
+    BUILD_NODES: list[dict] = []
+    BUILD_LOCAL_CAPACITY: int = 4
+    BUILD_NPM_CACHE_VOLUME: str = "vylos-npm-cache"
+    # Budget the local node's builds may use together (defaults to the whole host)
+    BUILD_LOCAL_CPUS: Optional[float] = None
+    BUILD_LOCAL_MEMORY: Optional[str] = None
+    BUILD_RETRY_AFTER_SECONDS: int = 30  # Used until a build duration is known
+    # RAM-backed build workspace per build (e.g. "2g"), None builds on disk.
+    # Builds that outgrow it are retried on disk.
+    BUILD_TMPFS_SIZE: Optional[str] = None
+
+    # Deployment status cache (running deployments are always kept)
+    STATUS_CACHE_SIZE: int = 5000  # Finished deployments kept in memory
+    STATUS_CACHE_TTL_SECONDS: float = 600.0
+
+    # Resource Limits (memory includes swap)
+    BUILD_CPUS: float = 2.0
+    BUILD_MEMORY: str = "2g"
+    BUILD_PIDS_LIMIT: int = 1024
+    RUNTIME_CPUS: float = 1.0
+    RUNTIME_MEMORY: str = "512m"
+    RUNTIME_PIDS_LIMIT: int = 256
+
+    # Runtime Reconciliation Settings
+    RESTORE_CONCURRENCY: int = 8  # Containers restored in parallel at startup
+    RECONCILE_GRACE_SECONDS: float = 5.0  # Let Docker's restart policy act first
+    RECONCILE_MAX_RESTARTS: int = 5
+    RECONCILE_RESTART_WINDOW_SECONDS: float = 300.0
+
+    # Nginx Settings
+    NGINX_CONTAINER_NAMES: list[str] = ["vylos-nginx-1", "vylos_nginx_1"]
+    NGINX_RELOAD_DEBOUNCE_SECONDS: float = 1.0
+    NGINX_RELOAD_TIMEOUT_SECONDS: float = 30.0
+    NGINX_BROTLI_STATIC: bool = False  # Requires the ngx_brotli module
+    NGINX_CACHE_ZONE_SIZE: str = "10m"
+    NGINX_CACHE_MAX_SIZE: str = "1g"
+    NGINX_CACHE_INACTIVE: str = "60m"
+    NGINX_CACHE_LOG_DIR: str = "/app/nginx-logs"
+    NGINX_CACHE_LOG_COLLECT_SECONDS: float = 60.0  # Cache logs are counted and truncated this often
 
     @property
     def DATABASE_URL(self) -> str:
@@ -55,6 +135,18 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """Database URL for the asyncpg driver"""
+        return self.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    @property
+    def ASYNC_REPLICA_URL(self) -> Optional[str]:
+        """Read replica URL for the asyncpg driver"""
+        if not self.DATABASE_REPLICA_URL:
+            return None
+        return self.DATABASE_REPLICA_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
     class Config:
         current_file_dir = os.path.dirname(os.path.abspath(__file__))
         env_file = os.path.join(current_file_dir, "..", "..", ".env")
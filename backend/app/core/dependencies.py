@@ -1,43 +1,82 @@
 """
 Dependency injection for FastAPI
 """
-from typing import Generator
+from typing import AsyncGenerator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 
-from app.db.session import SessionLocal
+from app.db.replica import read_router
+from app.db.session import AsyncSessionLocal
 from app.core.config import settings
 from app.db import models
+from app.services.principal_cache import cache_user, get_cached_user
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-def get_db() -> Generator:
+def _token_user_id(credentials: Optional[HTTPAuthorizationCredentials]) -> Optional[int]:
+    """User ID from a bearer token, None if missing or invalid"""
+    if credentials is None:
+        return None
+    try:
+        payload = jwt.decode(
+            credentials.credentials,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM]
+        )
+        return int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+
+async def get_db(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> AsyncGenerator[AsyncSession, None]:
     """
-    Database session dependency
+    Database session dependency (primary)
+    
+    Commits made through this session pin the user's reads to the
+    primary for a while, see app.db.replica.
     
     Yields:
-        SQLAlchemy database session
+        SQLAlchemy async database session
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
+        db.info["user_id"] = _token_user_id(credentials)
+        yield db
+
+
+async def get_read_db(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only database session dependency
+    
+    Served by the read replica when one is configured, healthy and the
+    user has not written recently, otherwise by the primary.
+    
+    Yields:
+        SQLAlchemy async database session
+    """
+    async with read_router.session(_token_user_id(credentials)) as db:
         yield db
-    finally:
-        db.close()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security), 
-    db: Session = Depends(get_db)
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> models.User:
     """
     Get current authenticated user from JWT token
     
+    Verified users are cached for PRINCIPAL_CACHE_TTL_SECONDS, a cache
+    hit does not touch the database. The returned user is detached, use
+    a session from get_db to change it.
+    
     Args:
         credentials: HTTP Authorization credentials
-        db: Database session
         
     Returns:
         User model instance
@@ -62,17 +101,28 @@ def get_current_user(
         user_id: str | None = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except JWTError:
+        user_id = int(user_id)
+    except (JWTError, ValueError):
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
+    user = get_cached_user(user_id)
+    if user is not None:
+        return user
+    
+    async with read_router.session(user_id) as db:
+        user = await db.get(models.User, user_id)
+        if user is None and db.info.get("replica"):
+            # Users who just signed up may not have reached the replica yet
+            async with AsyncSessionLocal() as primary:
+                user = await primary.get(models.User, user_id)
     if user is None:
         raise credentials_exception
     
+    cache_user(user)
     return user
 
 
-def get_current_active_user(
+async def get_current_active_user(
     current_user: models.User = Depends(get_current_user),
 ) -> models.User:
     """
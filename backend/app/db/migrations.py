@@ -0,0 +1,145 @@
+"""
+Schema upgrades for existing databases
+
+create_all() only creates missing tables. Columns and indexes added to
+existing tables are created here, every step is safe to run on each
+startup.
+"""
+from sqlalchemy import delete, exc, func, inspect, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+from app.db import models
+
+
+def ensure_columns(bind: Engine):
+    """
+    Add columns declared on the models that the database lacks
+    
+    New columns must be nullable or have a server default.
+    """
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table in models.Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}")
+                print(f"✓ Added column {table.name}.{column.name}")
+
+
+# Indexes an older schema created that the models no longer declare
+REDUNDANT_INDEXES = {
+    # Both covered by uq_projects_name
+    "projects": ["ix_projects_name", "uq_projects_owner_id_name"],
+}
+
+
+def dedupe_projects(bind: Engine):
+    """
+    Make project names unique before uq_projects_name is created
+    
+    Concurrent deploys could insert the same project twice for one owner,
+    the newest row of each (owner_id, name) is kept. Names used by several
+    owners were allowed before, the oldest project keeps the name and the
+    others are renamed to name-{owner_id} (their sites move with the name
+    on the next deploy).
+    """
+    if "uq_projects_name" in {index["name"] for index in inspect(bind).get_indexes("projects")}:
+        return
+    
+    projects = models.Project.__table__
+    newer = projects.alias("newer")
+    with bind.begin() as connection:
+        result = connection.execute(
+            delete(projects).where(
+                select(newer.c.id).where(
+                    newer.c.owner_id == projects.c.owner_id,
+                    newer.c.name == projects.c.name,
+                    newer.c.id > projects.c.id,
+                ).exists()
+            )
+        )
+        if result.rowcount:
+            print(f"✓ Removed {result.rowcount} duplicate projects, kept the newest of each")
+        
+        older = projects.alias("older")
+        shared = connection.execute(
+            select(projects.c.id, projects.c.name, projects.c.owner_id)
+            .where(
+                select(older.c.id).where(
+                    older.c.name == projects.c.name,
+                    older.c.id < projects.c.id,
+                ).exists()
+            )
+            .order_by(projects.c.id)
+        ).all()
+        if not shared:
+            return
+        
+        taken = set(connection.execute(select(projects.c.name)).scalars())
+        for project_id, name, owner_id in shared:
+            new_name = f"{name}-{owner_id}"
+            if new_name in taken:
+                new_name = f"{new_name}-{project_id}"
+            taken.add(new_name)
+            connection.execute(
+                update(projects).where(projects.c.id == project_id).values(name=new_name)
+            )
+            print(f"⚠ Project name {name} is used by several owners, renamed project {project_id} to {new_name}")
+
+
+def drop_redundant_indexes(bind: Engine):
+    """Drop indexes listed in REDUNDANT_INDEXES that still exist"""
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table_name, index_names in REDUNDANT_INDEXES.items():
+            existing = {index["name"] for index in inspector.get_indexes(table_name)}
+            for index_name in index_names:
+                if index_name in existing:
+                    connection.exec_driver_sql(f"DROP INDEX {index_name}")
+                    print(f"✓ Dropped redundant index {index_name}")
+
+
+def ensure_indexes(bind: Engine):
+    """
+    Create indexes declared on the models that the database lacks
+    
+    Raises:
+        RuntimeError: If a unique index cannot be created because the table
+            holds duplicates. Upserts conflict on these indexes, so the app
+            cannot run without them.
+    """
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=bind, checkfirst=True)
+            except exc.IntegrityError as e:
+                columns = [column.name for column in index.columns]
+                with bind.connect() as connection:
+                    duplicates = connection.execute(
+                        select(*index.columns)
+                        .group_by(*index.columns)
+                        .having(func.count() > 1)
+                        .limit(10)
+                    ).all()
+                raise RuntimeError(
+                    f"Cannot create unique index {index.name}: {table.name} has duplicate "
+                    f"{', '.join(columns)} values, e.g. {[tuple(row) for row in duplicates]}. "
+                    f"Rename or remove them, then restart."
+                ) from e
+
+
+def upgrade_schema(bind: Engine):
+    """
+    Bring an existing database up to the current models
+    
+    Args:
+        bind: Sync engine
+    """
+    ensure_columns(bind)
+    dedupe_projects(bind)
+    ensure_indexes(bind)
+    drop_redundant_indexes(bind)
@@ -1,7 +1,7 @@
 """
 Database Models
 """
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.session import Base
@@ -34,7 +34,7 @@ class Project(Base):
     __tablename__ = "projects"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True, nullable=False)
+    name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     framework = Column(String, nullable=True)
     status = Column(String, default="Queued")  # Queued, Building, Live, Failed
@@ -49,6 +49,9 @@ class Project(Base):
     # Build logs
     build_logs = Column(String, nullable=True)
     
+    # Bumped by every UPDATE (ORM or bulk), ETags are derived from it
+    revision = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("revision + 1"))
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     last_deployed_at = Column(DateTime, nullable=True)
@@ -59,5 +62,17 @@ class Project(Base):
     # Relationships
     owner = relationship("User", back_populates="projects")
 
+    # Project names are unique across owners: workdirs, containers, nginx
+    # configs and domains are all keyed by the bare name (the deploy upsert
+    # conflicts on it). Project lists are filtered per owner and paginated by id.
+    __table_args__ = (
+        Index("uq_projects_name", "name", unique=True),
+        Index("ix_projects_owner_id_id", "owner_id", "id"),
+        Index("ix_projects_owner_id_status", "owner_id", "status"),
+        Index("ix_projects_owner_id_framework", "owner_id", "framework"),
+    )
+    # Read the bumped revision back in the UPDATE instead of lazy loading it later
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
         return f"<Project(id={self.id}, name={self.name}, status={self.status})>"
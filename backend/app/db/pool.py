@@ -0,0 +1,137 @@
+"""
+Connection pool configuration and saturation metrics
+"""
+import threading
+import time
+from typing import Dict, Type
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+
+
+class PoolStats:
+    """Checkout counters and wait times for one engine's pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def record_checkout(self, wait_ms: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            return {
+                "pool_class": type(pool).__name__ if pool else None,
+                "size": pool.size() if isinstance(pool, QueuePool) else None,
+                "in_use": pool.checkedout() if isinstance(pool, QueuePool) else None,
+                "overflow": pool.overflow() if isinstance(pool, QueuePool) else None,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 2) if self.checkouts else None,
+                "max_wait_ms": round(self.max_wait_ms, 2),
+            }
+
+
+pool_stats: Dict[str, PoolStats] = {
+    "sync": PoolStats("sync"),
+    "async": PoolStats("async"),
+    "replica": PoolStats("replica"),
+}
+
+
+def _timed_pool_class(base: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """Subclass a pool so time spent waiting for a connection is recorded"""
+
+    class TimedPool(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            # Pools are recreated on dispose(), always report the live one
+            stats.pool = self
+
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                stats.record_timeout()
+                raise
+            stats.record_checkout((time.perf_counter() - started) * 1000)
+            return connection
+
+        def _do_return_conn(self, record):
+            stats.record_checkin()
+            super()._do_return_conn(record)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def engine_options(name: str) -> dict:
+    """
+    Keyword arguments for create_engine/create_async_engine
+
+    Behind a transaction pooler (DB_PGBOUNCER_MODE) the server side pooler
+    owns the connections: the client keeps none open between checkouts
+    and asyncpg's named prepared statements are turned off, since the
+    next transaction may land on a different server connection.
+
+    Args:
+        name: "sync", "async" or "replica" (async)
+    """
+    stats = pool_stats[name]
+    is_async = name != "sync"
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+
+    options = {"echo": settings.DEBUG}  # Log SQL queries in debug mode
+
+    if settings.DB_PGBOUNCER_MODE:
+        options["poolclass"] = _timed_pool_class(NullPool, stats)
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    options.update(
+        poolclass=_timed_pool_class(base, stats),
+        pool_pre_ping=True,  # Verify connections before using them
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return options
+
+
+def get_pool_stats() -> dict:
+    """Get pool metrics for every engine"""
+    return {
+        name: stats.snapshot()
+        for name, stats in pool_stats.items()
+        if stats.pool is not None
+    }
@@ -0,0 +1,166 @@
+"""
+Read Replica Routing - Sends read-only sessions to a replica when it is safe
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, ReplicaSessionLocal
+
+# Seconds the replica is behind the primary. A server that is not in
+# recovery is not replicating (e.g. a second standalone instance in
+# development), so it counts as caught up.
+REPLICA_LAG_SQL = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+# Sticky entries are pruned once this many users have written recently
+_MAX_STICKY_USERS = 10000
+
+
+class ReadRouter:
+    """
+    Chooses the primary or the replica for read-only sessions
+
+    Reads go to the replica only while its last health check succeeded
+    and it was no more than REPLICA_MAX_LAG_SECONDS behind. A user who
+    committed a write is pinned to the primary for REPLICA_STICKY_SECONDS
+    so they always read their own writes. Stickiness is tracked per
+    process.
+    """
+
+    def __init__(self, replica_factory, max_lag_seconds: float, sticky_seconds: float):
+        self.replica_factory = replica_factory
+        self.max_lag_seconds = max_lag_seconds
+        self.sticky_seconds = sticky_seconds
+
+        self._sticky_until: Dict[int, float] = {}
+        self._healthy = False
+        self._lag_seconds: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self._replica_reads = 0
+        self._primary_reads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica_factory is not None
+
+    def mark_write(self, user_id: int):
+        """Pin a user's reads to the primary after they committed a write"""
+        now = time.monotonic()
+        if len(self._sticky_until) >= _MAX_STICKY_USERS:
+            self._sticky_until = {
+                uid: until for uid, until in self._sticky_until.items() if until > now
+            }
+        self._sticky_until[user_id] = now + self.sticky_seconds
+
+    def _is_sticky(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        until = self._sticky_until.get(user_id)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._sticky_until[user_id]
+            return False
+        return True
+
+    def use_replica(self, user_id: Optional[int]) -> bool:
+        """Whether a read-only session for this user may use the replica"""
+        return self.enabled and self._healthy and not self._is_sticky(user_id)
+
+    @asynccontextmanager
+    async def session(self, user_id: Optional[int]) -> AsyncIterator[AsyncSession]:
+        """
+        Open a read-only session on the replica or the primary
+
+        Args:
+            user_id: Requesting user, for read-your-writes stickiness
+
+        Yields:
+            Async session. `session.info["replica"]` tells which one it is.
+        """
+        if self.use_replica(user_id):
+            self._replica_reads += 1
+            async with self.replica_factory() as db:
+                db.info["replica"] = True
+                yield db
+        else:
+            self._primary_reads += 1
+            async with AsyncSessionLocal() as db:
+                db.info["user_id"] = user_id
+                yield db
+
+    async def check(self):
+        """Measure replica lag and update its health"""
+        try:
+            async with self.replica_factory() as db:
+                lag = float((await db.execute(REPLICA_LAG_SQL)).scalar() or 0)
+        except Exception as e:
+            if self._healthy:
+                print(f"⚠ Read replica unavailable, reading from primary: {e}")
+            self._healthy = False
+            self._lag_seconds = None
+            self._last_error = str(e)
+            return
+
+        healthy = lag <= self.max_lag_seconds
+        if healthy != self._healthy:
+            if healthy:
+                print(f"✓ Read replica in use (lag {lag:.1f}s)")
+            else:
+                print(f"⚠ Read replica {lag:.1f}s behind, reading from primary")
+        self._healthy = healthy
+        self._lag_seconds = lag
+        self._last_error = None
+
+    async def _run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS)
+
+    def start(self):
+        """Start the replica health checks on the running loop (idempotent)"""
+        if not self.enabled or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def get_stats(self) -> dict:
+        """Get replica health and read routing counters"""
+        return {
+            "enabled": self.enabled,
+            "healthy": self._healthy,
+            "lag_seconds": self._lag_seconds,
+            "last_error": self._last_error,
+            "replica_reads": self._replica_reads,
+            "primary_reads": self._primary_reads,
+            "sticky_users": len(self._sticky_until),
+        }
+
+
+read_router = ReadRouter(
+    ReplicaSessionLocal,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer_to_primary(session: Session):
+    """Request sessions carry the user id, commits make that user sticky"""
+    user_id = session.info.get("user_id")
+    if user_id is not None and read_router.enabled:
+        read_router.mark_write(user_id)
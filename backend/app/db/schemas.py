@@ -76,15 +76,14 @@ class ProjectUpdate(BaseModel):
     branch: Optional[str] = Field(None, max_length=100)
 
 
-class ProjectResponse(ProjectBase):
-    """Project response schema"""
+class ProjectSummary(ProjectBase):
+    """Project list item schema (without build logs)"""
     id: int
     framework: Optional[str] = None
     status: str
     repo_url: str
     branch: str
     domain: Optional[str] = None
-    build_logs: Optional[str] = None
     created_at: datetime
     last_deployed_at: Optional[datetime] = None
     owner_id: int
@@ -93,6 +92,33 @@ class ProjectResponse(ProjectBase):
         from_attributes = True
 
 
+class ProjectResponse(ProjectSummary):
+    """Project response schema"""
+    build_logs: Optional[str] = None
+
+
+class ProjectStatusBatchRequest(BaseModel):
+    """Status batch request schema"""
+    names: List[str] = Field(..., min_length=1, max_length=200)
+    since: Optional[str] = None  # version from a previous response
+    wait_seconds: float = Field(default=0, ge=0, le=30)
+
+
+class ProjectStatus(BaseModel):
+    """Live status of one project"""
+    name: str
+    status: Optional[str] = None
+    domain: Optional[str] = None
+    queue_position: Optional[int] = None
+
+
+class ProjectStatusBatchResponse(BaseModel):
+    """Status batch response schema"""
+    projects: List[ProjectStatus]
+    missing: List[str] = []
+    version: str
+
+
 # --- Deployment Schemas ---
 class DeploymentBase(BaseModel):
     """Base deployment schema"""
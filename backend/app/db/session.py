@@ -2,15 +2,13 @@
 Database session and engine configuration
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.db.pool import engine_options
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using them
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
-)
+# Create database engine (background threads: deployments, reconciler)
+engine = create_engine(settings.DATABASE_URL, **engine_options("sync"))
 
 # Create session factory
 SessionLocal = sessionmaker(
@@ -19,5 +17,26 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async engine for request handlers, queries never block the event loop
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **engine_options("async"))
+
+# Objects stay usable after commit, async sessions cannot lazy load on access
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Optional read replica for read-only request handlers (see app.db.replica)
+replica_engine = (
+    create_async_engine(settings.ASYNC_REPLICA_URL, **engine_options("replica"))
+    if settings.ASYNC_REPLICA_URL else None
+)
+
+ReplicaSessionLocal = (
+    async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)
+    if replica_engine else None
+)
+
 # Create declarative base for models
 Base = declarative_base()
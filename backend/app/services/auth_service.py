@@ -2,19 +2,22 @@
 Authentication Service - Business logic for user authentication
 """
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.db import models
 from app.db import schemas
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import create_access_token
+from app.services.principal_cache import invalidate_user
+from app.utils.password_hasher import password_hasher
 
 
 class AuthService:
     """Authentication service for user management"""
     
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> Optional[models.User]:
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[models.User]:
         """
         Authenticate user with email and password
         
@@ -26,7 +29,8 @@ class AuthService:
         Returns:
             User model if authentication successful, None otherwise
         """
-        user = db.query(models.User).filter(models.User.email == email).first()
+        result = await db.execute(select(models.User).where(models.User.email == email))
+        user = result.scalars().first()
         
         if not user:
             return None
@@ -38,14 +42,20 @@ class AuthService:
                 detail="Please login with Google/GitHub"
             )
         
-        # Verify password
-        if not verify_password(password, str(user.hashed_password)):
+        # Verify password (bcrypt is slow on purpose, it runs in worker processes)
+        valid, new_hash = await password_hasher.verify_and_update(password, str(user.hashed_password))
+        if not valid:
             return None
         
+        # Upgrade hashes made with an outdated cost while we know the password
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+        
         return user
     
     @staticmethod
-    def create_user(db: Session, user_data: schemas.UserSignup) -> models.User:
+    async def create_user(db: AsyncSession, user_data: schemas.UserSignup) -> models.User:
         """
         Create a new user
         
@@ -60,21 +70,23 @@ class AuthService:
             HTTPException: If email or username already exists
         """
         # Check if email exists
-        if db.query(models.User).filter(models.User.email == user_data.email).first():
+        result = await db.execute(select(models.User.id).where(models.User.email == user_data.email))
+        if result.first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
         # Check if username exists
-        if db.query(models.User).filter(models.User.username == user_data.username).first():
+        result = await db.execute(select(models.User.id).where(models.User.username == user_data.username))
+        if result.first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
             )
         
         # Create user
-        hashed_pwd = get_password_hash(user_data.password)
+        hashed_pwd = await password_hasher.hash(user_data.password)
         new_user = models.User(
             email=user_data.email,
             username=user_data.username,
@@ -84,14 +96,14 @@ class AuthService:
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         
         return new_user
     
     @staticmethod
-    def create_or_update_oauth_user(
-        db: Session,
+    async def create_or_update_oauth_user(
+        db: AsyncSession,
         email: str,
         provider: str,
         access_token: Optional[str] = None,
@@ -110,7 +122,8 @@ class AuthService:
         Returns:
             User model
         """
-        user = db.query(models.User).filter(models.User.email == email).first()
+        result = await db.execute(select(models.User).where(models.User.email == email))
+        user = result.scalars().first()
         
         if not user:
             # Create new OAuth user
@@ -129,8 +142,42 @@ class AuthService:
             if avatar_url:
                 setattr(user, 'avatar_url', avatar_url)
         
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        invalidate_user(user.id)
+        
+        return user
+    
+    @staticmethod
+    async def set_user_active(db: AsyncSession, user_id: int, is_active: bool) -> models.User:
+        """
+        Activate or deactivate a user
+        
+        Deactivation takes effect on the user's next request, the cached
+        principal is dropped.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            is_active: New state
+            
+        Returns:
+            User model
+            
+        Raises:
+            HTTPException: If the user does not exist
+        """
+        user = await db.get(models.User, user_id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        user.is_active = is_active
+        await db.commit()
+        await db.refresh(user)
+        invalidate_user(user.id)
         
         return user
     
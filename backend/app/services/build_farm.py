@@ -0,0 +1,287 @@
+"""
+Build Farm - Registry of Docker engines that run builds, and build placement
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set, Union
+
+from app.core.config import settings
+from app.utils.async_docker import AsyncDockerClient, get_async_docker_client
+from app.utils.change_notifier import status_changes
+from app.utils.resources import ResourceProfile, build_profile, host_memory, parse_memory
+
+
+class DeploymentInProgress(Exception):
+    """Raised when a project is admitted while its previous deployment still runs"""
+
+
+class BuildNode:
+    """A Docker engine that can run build containers"""
+
+    def __init__(
+        self,
+        name: str,
+        docker_host: Optional[str] = None,
+        capacity: int = 1,
+        shares_workspace: bool = False,
+        cpus: Optional[float] = None,
+        memory: Union[str, int, None] = None
+    ):
+        """
+        Args:
+            name: Unique node name
+            docker_host: Engine URL (unix:// or tcp://), None for the local engine
+            capacity: Number of builds the node runs at once
+            shares_workspace: Whether HOST_PROJECTS_PATH is mounted on this
+                engine's host, so builds can bind mount the workspace instead
+                of shipping it as a tar archive
+            cpus: CPU cores builds on this node may reserve in total
+            memory: Memory builds on this node may reserve in total (e.g. "16g")
+        """
+        self.name = name
+        self.docker_host = docker_host
+        self.capacity = capacity
+        self.shares_workspace = shares_workspace
+        self.cpus = cpus
+        self.memory = parse_memory(memory)
+        self.active = 0
+        self.used_cpus = 0.0
+        self.used_memory = 0
+        self._client: Optional[AsyncDockerClient] = None
+
+    @property
+    def client(self) -> AsyncDockerClient:
+        if self._client is None:
+            self._client = (
+                AsyncDockerClient(self.docker_host) if self.docker_host
+                else get_async_docker_client()
+            )
+        return self._client
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.active
+
+    def fits(self, profile: ResourceProfile) -> int:
+        """Number of additional builds with this profile the node can run now"""
+        count = self.free
+        if self.cpus and profile.cpus:
+            count = min(count, int((self.cpus - self.used_cpus) // profile.cpus))
+        if self.memory and profile.memory:
+            count = min(count, (self.memory - self.used_memory) // profile.memory)
+        return max(count, 0)
+
+    def can_ever_fit(self, profile: ResourceProfile) -> bool:
+        """Whether an idle node has room for a build with this profile"""
+        if self.cpus and profile.cpus and profile.cpus > self.cpus:
+            return False
+        if self.memory and profile.memory and profile.memory > self.memory:
+            return False
+        return self.capacity > 0
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "capacity": self.capacity,
+            "active": self.active,
+            "cpus": self.cpus,
+            "used_cpus": self.used_cpus,
+            "memory": self.memory,
+            "used_memory": self.used_memory,
+            "shares_workspace": self.shares_workspace,
+        }
+
+
+class BuildFarm:
+    """
+    Places builds on nodes by free resources and cache locality
+
+    A build reserves a slot plus the CPU and memory of its resource profile.
+    A project goes back to the node that built it last when that node has
+    room, so its npm cache volume and pulled images are warm. Otherwise the
+    least-loaded node wins. When every node is full, callers wait
+    until a build finishes.
+
+    Deployments are admitted up front with admit(): a deployment is only
+    accepted while the farm can start it right away, counting deployments
+    that were admitted but have not reached their build step yet. A project
+    has at most one deployment in flight, from admit() to finish_deployment().
+    """
+
+    def __init__(self, nodes: List[BuildNode]):
+        self.nodes: Dict[str, BuildNode] = {node.name: node for node in nodes}
+        self._last_node: Dict[str, str] = {}
+        self._condition: Optional[asyncio.Condition] = None
+        # Projects waiting for a build slot, roughly in arrival order
+        self._queue: List[str] = []
+        self._admitted: Set[str] = set()
+        # Projects with a deployment in flight, admitted or already building
+        self._deploying: Set[str] = set()
+        self._rejected = 0
+        self._avg_build_seconds: Optional[float] = None
+        # Build step durations per workspace mode (tmpfs, disk, archive)
+        self._build_times: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def from_settings(cls) -> "BuildFarm":
+        """Build the registry from BUILD_NODES, defaulting to the local engine"""
+        nodes = [BuildNode(**node) for node in settings.BUILD_NODES]
+        if not nodes:
+            nodes = [BuildNode(
+                name="local",
+                capacity=settings.BUILD_LOCAL_CAPACITY,
+                shares_workspace=True,
+                cpus=settings.BUILD_LOCAL_CPUS or os.cpu_count(),
+                memory=settings.BUILD_LOCAL_MEMORY or host_memory(),
+            )]
+        return cls(nodes)
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _pick(self, project_id: str, profile: ResourceProfile) -> Optional[BuildNode]:
+        candidates = [node for node in self.nodes.values() if node.fits(profile) > 0]
+        if not candidates:
+            return None
+
+        last = self.nodes.get(self._last_node.get(project_id, ""))
+        if last in candidates:
+            return last
+
+        return max(candidates, key=lambda node: (node.free / node.capacity, node.free))
+
+    def admit(self, project_id: str, profile: ResourceProfile = build_profile) -> bool:
+        """
+        Admit a deployment if the farm has room to build it now
+
+        Args:
+            project_id: Project about to be deployed
+            profile: Resources its build will request
+
+        Returns:
+            True if admitted. The admission is held until the build is placed
+            or finish_deployment() is called.
+
+        Raises:
+            DeploymentInProgress: If the project is already being deployed
+        """
+        if project_id in self._deploying:
+            raise DeploymentInProgress(f"{project_id} is already being deployed")
+
+        room = sum(node.fits(profile) for node in self.nodes.values())
+        if room <= len(self._admitted):
+            self._rejected += 1
+            return False
+
+        self._admitted.add(project_id)
+        self._deploying.add(project_id)
+        return True
+
+    def finish_deployment(self, project_id: str):
+        """Mark a deployment as done, dropping its admission if it never reached a build"""
+        self._admitted.discard(project_id)
+        self._deploying.discard(project_id)
+
+    def retry_after(self) -> int:
+        """Seconds a rejected caller should wait before retrying"""
+        if self._avg_build_seconds is None:
+            return settings.BUILD_RETRY_AFTER_SECONDS
+        return max(5, int(self._avg_build_seconds))
+
+    @asynccontextmanager
+    async def reserve(
+        self,
+        project_id: str,
+        profile: ResourceProfile = build_profile
+    ) -> AsyncIterator[BuildNode]:
+        """
+        Reserve a build slot and resources for the duration of the block
+
+        Args:
+            project_id: Project being built (used for cache locality)
+            profile: Resources the build container is limited to
+
+        Yields:
+            The node the build should run on
+        """
+        if not any(node.can_ever_fit(profile) for node in self.nodes.values()):
+            raise Exception(f"No build node can run a build with limits {profile.to_dict()}")
+
+        condition = self._get_condition()
+        async with condition:
+            node = self._pick(project_id, profile)
+            if node is None:
+                self._queue.append(project_id)
+                self._notify_queue()
+                try:
+                    while node is None:
+                        await condition.wait()
+                        node = self._pick(project_id, profile)
+                finally:
+                    self._queue.remove(project_id)
+                    status_changes.notify(project_id)
+                    self._notify_queue()
+            node.active += 1
+            node.used_cpus += profile.cpus or 0
+            node.used_memory += profile.memory or 0
+            self._last_node[project_id] = node.name
+            self._admitted.discard(project_id)
+
+        started = time.monotonic()
+        try:
+            yield node
+        finally:
+            elapsed = time.monotonic() - started
+            async with condition:
+                node.active -= 1
+                node.used_cpus -= profile.cpus or 0
+                node.used_memory -= profile.memory or 0
+                self._avg_build_seconds = (
+                    elapsed if self._avg_build_seconds is None
+                    else 0.8 * self._avg_build_seconds + 0.2 * elapsed
+                )
+                condition.notify_all()
+
+    def queue_position(self, project_id: str) -> Optional[int]:
+        """Position of a build waiting for a slot (1 is next), None if not waiting"""
+        try:
+            return self._queue.index(project_id) + 1
+        except ValueError:
+            return None
+
+    def _notify_queue(self):
+        # Every waiting build may have moved
+        for project_id in self._queue:
+            status_changes.notify(project_id)
+
+    def record_build_time(self, mode: str, seconds: float):
+        """Record how long a build step took in a given workspace mode"""
+        times = self._build_times.setdefault(mode, {"count": 0, "total_seconds": 0.0})
+        times["count"] += 1
+        times["total_seconds"] += seconds
+
+    def get_stats(self) -> dict:
+        """Get per-node load, queued builds and admission counters"""
+        return {
+            "waiting": len(self._queue),
+            "admitted": len(self._admitted),
+            "deploying": len(self._deploying),
+            "rejected": self._rejected,
+            "avg_build_seconds": round(self._avg_build_seconds, 1) if self._avg_build_seconds is not None else None,
+            "build_modes": {
+                mode: {
+                    "count": int(times["count"]),
+                    "avg_seconds": round(times["total_seconds"] / times["count"], 1),
+                }
+                for mode, times in self._build_times.items()
+            },
+            "nodes": [node.to_dict() for node in self.nodes.values()],
+        }
+
+
+build_farm = BuildFarm.from_settings()
@@ -1,16 +1,40 @@
 """
 Deployment Service - Business logic for Docker deployments
 """
+import asyncio
 import os
+import re
 import shutil
-import docker
+import time
+from datetime import datetime
 from typing import Optional
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 
 from app.db import models
 from app.db.session import SessionLocal
 from app.core.config import settings
-from app.services.project_service import ProjectService
+from app.services.build_farm import build_farm
+from app.services.executors import docker_executor, select_executor
+from app.services.nginx_service import nginx_reload_coordinator
+from app.services.runtime_service import runtime_reconciler
+from app.services.status_cache import status_cache
+from app.utils.async_docker import DockerNotFound, get_async_docker_client
+from app.utils.compression import brotli_available, precompress_directory
+from app.utils.fingerprint import scan_fingerprinted_assets
+from app.utils.git_fetch import clone_repository
+from app.utils.resources import runtime_profile
+
+
+_JS_STRING_OR_COMMENT_RE = re.compile(
+    r"""("(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)|//[^\n]*|/\*.*?\*/""",
+    re.S
+)
+
+
+def _strip_js_comments(source: str) -> str:
+    """Remove // and /* */ comments from JavaScript, leaving string literals alone"""
+    return _JS_STRING_OR_COMMENT_RE.sub(lambda match: match.group(1) or "", source)
 
 
 class DeploymentService:
@@ -18,27 +42,14 @@ class DeploymentService:
     
     # In-memory log storage (in production, use Redis)
     _logs_cache = {}
-    # In-memory status cache to avoid DB queries
-    _status_cache = {}
     
-    def __init__(self):
-        """Initialize Docker client"""
-        import os
-        # Ensure DOCKER_HOST is set
-        if not os.getenv('DOCKER_HOST'):
-            os.environ['DOCKER_HOST'] = 'unix:///var/run/docker.sock'
-        
-        try:
-            # Use from_env which respects DOCKER_HOST environment variable
-            self.client = docker.from_env()
-            # Test connection
-            self.client.ping()
-            print("✓ Docker client initialized successfully")
-        except Exception as e:
-            print(f"Failed to connect to Docker: {e}")
-            print(f"DOCKER_HOST: {os.getenv('DOCKER_HOST')}")
-            print(f"Socket exists: {os.path.exists('/var/run/docker.sock')}")
-            raise Exception(f"Could not connect to Docker daemon. Error: {str(e)}")
+    # Strong references to fire-and-forget tasks so they are not garbage collected
+    _background_tasks = set()
+    
+    @property
+    def client(self):
+        """Shared async Docker Engine API client"""
+        return get_async_docker_client()
     
     def add_log(self, project_id: str, message: str):
         """Add log message to cache"""
@@ -50,36 +61,40 @@ class DeploymentService:
         """Get logs from cache"""
         return self._logs_cache.get(project_id, [])
     
-    def get_status(self, project_id: str) -> dict:
-        """Get cached status for a project"""
-        return self._status_cache.get(project_id, {'status': 'Building', 'domain': None})
+    async def get_status(self, project_id: str, owner_id: int) -> Optional[dict]:
+        """Get a project's status from the status cache (read-through)"""
+        return await status_cache.get(project_id, owner_id)
     
-    def update_status(self, project_id: str, status: str, domain: str = ""):
-        """Update cached status for a project"""
-        if project_id not in self._status_cache:
-            self._status_cache[project_id] = {}
-        self._status_cache[project_id]['status'] = status
-        if domain:
-            self._status_cache[project_id]['domain'] = domain
+    def update_status(self, project_id: str, status: str, domain: str = "", owner_id: Optional[int] = None):
+        """Update cached status for a project and wake anyone waiting on it"""
+        status_cache.set(project_id, status, domain, owner_id)
     
     def clear_logs(self, project_id: str):
         """Clear logs for a project"""
         if project_id in self._logs_cache:
             del self._logs_cache[project_id]
     
-    def run_deployment(
+    async def run_deployment(
         self,
         git_url: str,
         project_id: str,
-        user_id: int
+        user_id: int,
+        project_pk: int,
+        created: bool
     ) -> None:
         """
         Run deployment in background
         
+        Container operations are awaited on the event loop. Blocking DB and
+        filesystem work is pushed to worker threads one step at a time.
+        
         Args:
             git_url: Git repository URL
             project_id: Project identifier
             user_id: User ID
+            project_pk: Database ID of the project, already marked Building
+                by ProjectService.start_deploy
+            created: Whether start_deploy created the project
         """
         db = SessionLocal()
         print(f"\n[START] Build for: {project_id}")
@@ -89,71 +104,43 @@ class DeploymentService:
         # Clear old logs
         self.clear_logs(project_id)
         
-        # Initialize status cache
-        self.update_status(project_id, 'Building')
-        
         try:
+            project = await asyncio.to_thread(db.get, models.Project, project_pk)
+            
+            # Initialize status cache
+            self.update_status(project_id, 'Building', owner_id=user_id)
+            
+            # Keep the reconciler from restarting the old container while it is replaced
+            runtime_reconciler.set_desired(project_id, False)
+            
             # Log start
             self.add_log(project_id, f"🚀 Starting deployment for {project_id}")
             
-            # Get or create project (single query with commit)
-            project = db.query(models.Project).filter(
-                models.Project.name == project_id
-            ).first()
-            
-            if not project:
-                project = models.Project(
-                    name=project_id,
-                    repo_url=git_url,
-                    status="Building",
-                    owner_id=user_id
-                )
-                db.add(project)
-                db.flush()  # Get ID without full commit
+            if created:
                 self.add_log(project_id, f"✓ Created new project: {project_id}")
             else:
-                setattr(project, 'status', "Building")
                 self.add_log(project_id, f"✓ Updating existing project: {project_id}")
             
-            # Commit only once at the start
-            db.commit()
-            
             # Prepare paths
             internal_work_dir = f"/app/projects/{project_id}"
             host_work_dir = f"{settings.HOST_PROJECTS_PATH}/{project_id}"
             
-            if os.path.exists(internal_work_dir):
-                shutil.rmtree(internal_work_dir)
+            if await asyncio.to_thread(self._reset_work_dir, internal_work_dir):
                 self.add_log(project_id, "✓ Cleaned old build directory")
-            os.makedirs(internal_work_dir, exist_ok=True)
             
             # Clone and detect framework first
             self.add_log(project_id, f"📦 Repository: {git_url}")
             self.add_log(project_id, "📥 Cloning repository...")
             
-            clone_cmd = (
-                f'sh -c "apk add --no-cache git && '
-                f'git clone --depth 1 {git_url} /output"'
+            # git runs in the backend itself, no clone container to start
+            clone_started = time.monotonic()
+            await clone_repository(
+                git_url,
+                internal_work_dir,
+                on_progress=lambda line: self.add_log(project_id, line)
             )
             
-            clone_container = self.client.containers.run(
-                image="node:20-alpine",
-                command=clone_cmd,
-                volumes={host_work_dir: {'bind': '/output', 'mode': 'rw'}},
-                detach=True
-            )
-            
-            for line in clone_container.logs(stream=True, follow=True):
-                log_line = line.decode('utf-8').strip()
-                print(f"[{project_id}] {log_line}")
-            
-            clone_result = clone_container.wait()
-            clone_container.remove(force=True)
-            
-            if clone_result.get('StatusCode', 1) != 0:
-                raise Exception("Failed to clone repository")
-            
-            self.add_log(project_id, "✓ Repository cloned successfully")
+            self.add_log(project_id, f"✓ Repository cloned in {time.monotonic() - clone_started:.1f}s")
             
             # Detect framework
             framework = self._detect_framework(internal_work_dir)
@@ -163,10 +150,19 @@ class DeploymentService:
             setattr(project, 'framework', framework)
             
             # Deploy based on framework
-            if framework == "nextjs":
-                self._deploy_nextjs(project_id, internal_work_dir, host_work_dir, db, project)
+            if framework == "nextjs" and self._is_static_export(internal_work_dir):
+                # Fully static Next.js apps are served by nginx, no Node server needed
+                self.add_log(project_id, "🔍 Next.js static export detected, deploying as static site")
+                if await self._remove_nextjs_runtime(project_id):
+                    self.add_log(project_id, "✓ Stopped old Next.js server container")
+                await self._deploy_static(
+                    project_id, internal_work_dir, host_work_dir, db, project,
+                    output_dirs="out", require_output=True
+                )
+            elif framework == "nextjs":
+                await self._deploy_nextjs(project_id, internal_work_dir, host_work_dir, db, project)
             else:
-                self._deploy_static(project_id, internal_work_dir, host_work_dir, db, project)
+                await self._deploy_static(project_id, internal_work_dir, host_work_dir, db, project)
             
         except Exception as e:
             print(f"[ERROR] Deployment failed: {e}")
@@ -175,33 +171,77 @@ class DeploymentService:
             # Update status cache immediately
             self.update_status(project_id, 'Failed')
             
+            # An old server container that survived the failed deploy is still wanted
+            runtime_reconciler.set_desired(project_id, await self._has_nextjs_runtime(project_id))
+            
             if project:
                 # Batch updates: status and build logs in single commit
                 setattr(project, 'status', "Failed")
                 setattr(project, 'build_logs', '\n'.join(self.get_logs(project_id)))
-                db.commit()
-                db.refresh(project)
+                await asyncio.to_thread(self._save_project, db, project)
         
         finally:
+            # Frees the project for its next deployment, and the admission if it never built
+            build_farm.finish_deployment(project_id)
             # Clear logs from memory after saving to database
             self.clear_logs(project_id)
-            db.close()
+            await asyncio.to_thread(db.close)
     
-    def _deploy_static(self, project_id: str, internal_work_dir: str, host_work_dir: str, db: Session, project):
+    def _save_project(self, db: Session, project):
+        """Commit pending project changes (runs in a thread)"""
+        db.commit()
+        db.refresh(project)
+    
+    def _reset_work_dir(self, internal_work_dir: str) -> bool:
+        """Empty the build directory, returning True if an old build was removed"""
+        existed = os.path.exists(internal_work_dir)
+        if existed:
+            shutil.rmtree(internal_work_dir)
+        os.makedirs(internal_work_dir, exist_ok=True)
+        return existed
+    
+    async def _deploy_static(
+        self,
+        project_id: str,
+        internal_work_dir: str,
+        host_work_dir: str,
+        db: Session,
+        project,
+        output_dirs: str = "dist build out public",
+        require_output: bool = False
+    ):
         """
         Deploy static site (React, Vue, HTML, etc.)
         
         How it works:
         1. Source code is already cloned to /app (host: ./projects/{project_id}/)
-        2. If package.json exists: npm install && npm run build
+        2. If package.json exists: npm install && npm run build in a container,
+           otherwise the files are deployed as-is without starting one
         3. Find build output directory (dist, build, out, or public)
         4. Move ONLY the built files to /app root, delete source files
         5. Nginx serves files from /var/www/html/{project_id} (mapped to ./projects/{project_id}/)
         
         Result: Static HTML/CSS/JS files at ./projects/{project_id}/index.html (served by nginx)
+        
+        output_dirs lists the candidate build output directories, in order.
+        With require_output, the build fails when none of them exists instead
+        of serving the source files.
         """
         self.add_log(project_id, "⏳ Building static assets...")
         
+        if require_output:
+            # Never publish the source tree, it may hold server code and secrets
+            missing_output = (
+                f'  echo \\"❌ Build produced no {output_dirs} directory\\" && '
+                f'  exit 1; '
+            )
+        else:
+            missing_output = (
+                f'  echo \\"⚠ No standard build directory found (dist/build/out/public)\\" && '
+                f'  echo \\"Using source files as-is\\" && '
+                f'  exit 0; '
+            )
+        
         # Build and replace source with output - all in the same directory
         build_cmd = (
             f'sh -c "cd /app && '
@@ -212,7 +252,7 @@ class DeploymentService:
             f'  npm run build && '
             f'  echo \\"📂 Looking for build output...\\" && '
             # Check each possible build output directory
-            f'  for dir in dist build out public; do '
+            f'  for dir in {output_dirs}; do '
             f'    if [ -d \\"$dir\\" ]; then '
             f'      echo \\"✓ Found build output in $dir\\" && '
             # Create temp directory, move build output there, clean /app, move output back
@@ -226,9 +266,7 @@ class DeploymentService:
             f'      exit 0; '
             f'    fi; '
             f'  done; '
-            f'  echo \\"⚠ No standard build directory found (dist/build/out/public)\\" && '
-            f'  echo \\"Using source files as-is\\" && '
-            f'  exit 0; '
+            f'{missing_output}'
             f'else '
             f'  echo \\"📄 No package.json - serving as static HTML\\" && '
             f'  ls -la /app && '
@@ -236,27 +274,33 @@ class DeploymentService:
             f'fi"'
         )
         
-        # Mount only the project directory - build happens in place
-        container = self.client.containers.run(
-            image="node:20-alpine",
-            command=build_cmd,
-            volumes={host_work_dir: {'bind': '/app', 'mode': 'rw'}},
-            detach=True
-        )
-        
-        self.add_log(project_id, "✓ Build container started...")
+        executor = select_executor(internal_work_dir)
+        self.add_log(project_id, f"✓ Build started ({executor.name} executor)...")
         
-        # Stream logs
-        for line in container.logs(stream=True, follow=True):
-            log_line = line.decode('utf-8').strip()
-            print(f"[{project_id}] {log_line}")
-            self.add_log(project_id, log_line)
-        
-        result = container.wait()
-        container.remove(force=True)
+        # Build in place - on remote nodes, in a copy that is shipped back
+        exit_code = await executor.build(
+            project_id, build_cmd, internal_work_dir, host_work_dir,
+            log=lambda line: self.add_log(project_id, line)
+        )
         
-        if result.get('StatusCode', 1) == 0:
+        if exit_code == 0:
             self.add_log(project_id, "✅ Build completed successfully!")
+            
+            # Precompress assets so nginx can serve them with gzip_static
+            await self._precompress_assets(project_id, internal_work_dir)
+            
+            # Cache content-hashed assets forever, revalidate HTML on every visit
+            fingerprints = await asyncio.to_thread(scan_fingerprinted_assets, internal_work_dir)
+            self.add_log(
+                project_id,
+                f"✓ Found {len(fingerprints['dirs'])} fingerprinted directories "
+                f"and {len(fingerprints['files'])} fingerprinted files"
+            )
+            
+            self._create_nginx_static(project_id, fingerprints)
+            if not await self._reload_nginx():
+                self.add_log(project_id, "⚠ Nginx reload failed, site config will apply on next reload")
+            
             self.add_log(project_id, f"📁 Static files ready at: ./projects/{project_id}/")
             self.add_log(project_id, f"🌐 Live at: http://{project_id}{settings.DOMAIN_SUFFIX}")
             
@@ -266,13 +310,13 @@ class DeploymentService:
             # Batch all updates: status, domain, framework, and build logs in single commit
             setattr(project, 'status', "Live")
             setattr(project, 'domain', f"{project_id}{settings.DOMAIN_SUFFIX}")
+            setattr(project, 'last_deployed_at', datetime.utcnow())
             setattr(project, 'build_logs', '\n'.join(self.get_logs(project_id)))
-            db.commit()
-            db.refresh(project)
+            await asyncio.to_thread(self._save_project, db, project)
         else:
             raise Exception("Build failed")
     
-    def _deploy_nextjs(self, project_id: str, internal_work_dir: str, host_work_dir: str, db: Session, project):
+    async def _deploy_nextjs(self, project_id: str, internal_work_dir: str, host_work_dir: str, db: Session, project):
         """Deploy Next.js application with persistent container"""
         self.add_log(project_id, "⏳ Building Next.js application...")
         
@@ -281,65 +325,66 @@ class DeploymentService:
             'sh -c "cd /app && npm install && npm run build"'
         )
         
-        build_container = self.client.containers.run(
-            image="node:20-alpine",
-            command=build_cmd,
-            volumes={host_work_dir: {'bind': '/app', 'mode': 'rw'}},
-            detach=True
-        )
-        
         self.add_log(project_id, "✓ Build started...")
         
-        # Stream build logs
-        for line in build_container.logs(stream=True, follow=True):
-            log_line = line.decode('utf-8').strip()
-            print(f"[{project_id}] {log_line}")
-            self.add_log(project_id, log_line)
-        
-        build_result = build_container.wait()
-        build_container.remove(force=True)
+        build_exit_code = await docker_executor.build(
+            project_id, build_cmd, internal_work_dir, host_work_dir,
+            log=lambda line: self.add_log(project_id, line)
+        )
         
-        if build_result.get('StatusCode', 1) != 0:
+        if build_exit_code != 0:
             raise Exception("Next.js build failed")
         
         self.add_log(project_id, "✅ Build completed!")
         self.add_log(project_id, "🚀 Starting Next.js server...")
         
         # Stop any existing container for this project
-        try:
-            existing = self.client.containers.get(f"nextjs-{project_id}")
-            existing.stop()
-            existing.remove()
+        if await self._remove_nextjs_runtime(project_id):
             self.add_log(project_id, "✓ Stopped old container")
-        except:
-            pass
+        
+        # Prefer the slim standalone bundle over the full project with node_modules
+        runtime_dir = await asyncio.to_thread(self._package_standalone, project_id, internal_work_dir)
+        if runtime_dir:
+            runtime_mode = "standalone"
+            command = 'node server.js'
+            mount_dir = f"{settings.HOST_RUNTIMES_PATH}/{project_id}"
+            self.add_log(project_id, "✓ Packaged standalone output (server.js, .next/static, public)")
+        else:
+            runtime_mode = "npm start"
+            command = 'sh -c "cd /app && npm start"'
+            mount_dir = host_work_dir
+            self.add_log(project_id, "ℹ No standalone output, set output: 'standalone' in next.config to shrink the runtime")
         
         # Start Next.js server in a persistent container
         port = self._get_available_port()
+        started_at = time.monotonic()
         
-        server_container = self.client.containers.run(
+        server_container_id = await self.client.run_container(
             image="node:20-alpine",
-            command='sh -c "cd /app && npm start"',
-            volumes={host_work_dir: {'bind': '/app', 'mode': 'ro'}},
+            command=command,
+            working_dir="/app",
+            environment={"PORT": "3000", "HOSTNAME": "0.0.0.0", "NODE_ENV": "production"},
+            volumes={mount_dir: {'bind': '/app', 'mode': 'ro'}},
             ports={'3000/tcp': port},
             name=f"nextjs-{project_id}",
-            detach=True,
-            auto_remove=False,
             network="vylos_vylos_network",
-            restart_policy={"Name": "on-failure", "MaximumRetryCount": 5}  # Auto-restart on failure
+            restart_policy={"Name": "on-failure", "MaximumRetryCount": 5},  # Auto-restart on failure
+            host_config=runtime_profile.host_config()
         )
         
-        # Update container to restart on failure
-        server_container.update(restart_policy={'Name': 'on-failure', 'MaximumRetryCount': 5})
-        
         self.add_log(project_id, f"✅ Next.js server started on port {port}")
+        runtime_reconciler.set_desired(project_id, True)
         
         # Create nginx reverse proxy configuration
-        self._create_nginx_proxy(project_id, port)
-        self.add_log(project_id, f"✓ Configured nginx proxy")
-        
-        # Reload nginx to apply new config
-        self._reload_nginx()
+        # A new cache key version makes every response cached for the
+        # previous build unreachable, which purges the edge cache
+        cache_version = int(time.time())
+        self._create_nginx_proxy(project_id, port, cache_version)
+        self.add_log(project_id, f"✓ Configured nginx proxy (edge cache version {cache_version})")
+        
+        # Reload nginx to apply new config (batched with other deploys)
+        if not await self._reload_nginx():
+            self.add_log(project_id, "⚠ Nginx reload failed, proxy config will apply on next reload")
         self.add_log(project_id, f"🌐 Live at: http://{project_id}{settings.DOMAIN_SUFFIX}")
         
         # Update status cache immediately
@@ -348,28 +393,156 @@ class DeploymentService:
         # Batch all updates: status, domain, framework, and build logs in single commit
         setattr(project, 'status', "Live")
         setattr(project, 'domain', f"{project_id}{settings.DOMAIN_SUFFIX}")
+        setattr(project, 'last_deployed_at', datetime.utcnow())
         setattr(project, 'build_logs', '\n'.join(self.get_logs(project_id)))
-        db.commit()
-        db.refresh(project)
+        await asyncio.to_thread(self._save_project, db, project)
+        
+        # Readiness can take up to a minute, probe it without holding up the deploy
+        task = asyncio.create_task(
+            self._log_runtime_footprint(project_id, server_container_id, runtime_mode, started_at)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    def _package_standalone(self, project_id: str, internal_work_dir: str) -> Optional[str]:
+        """
+        Copy Next.js standalone output into a slim runtime directory
+        
+        Args:
+            project_id: Project identifier
+            internal_work_dir: Built project directory
+            
+        Returns:
+            Runtime directory path, or None if the build has no standalone output
+        """
+        standalone_dir = os.path.join(internal_work_dir, ".next", "standalone")
+        if not os.path.exists(os.path.join(standalone_dir, "server.js")):
+            return None
+        
+        # Runtimes live outside the nginx web root so server code is never served
+        runtime_dir = f"/app/runtimes/{project_id}"
+        if os.path.exists(runtime_dir):
+            shutil.rmtree(runtime_dir)
+        
+        shutil.copytree(standalone_dir, runtime_dir, symlinks=True)
+        
+        static_dir = os.path.join(internal_work_dir, ".next", "static")
+        if os.path.isdir(static_dir):
+            shutil.copytree(static_dir, os.path.join(runtime_dir, ".next", "static"), dirs_exist_ok=True)
+        
+        public_dir = os.path.join(internal_work_dir, "public")
+        if os.path.isdir(public_dir):
+            shutil.copytree(public_dir, os.path.join(runtime_dir, "public"), dirs_exist_ok=True)
+        
+        return runtime_dir
+    
+    async def _log_runtime_footprint(self, project_id: str, container_id: str, runtime_mode: str, started_at: float):
+        """
+        Record time until the server accepts connections and its memory use
+        
+        Runs after the deploy is Live and its logs were saved, so the line is
+        appended to the stored build logs instead of the in-memory log cache.
+        """
+        ready_in = None
+        deadline = started_at + 60
+        while time.monotonic() < deadline:
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(f"nextjs-{project_id}", 3000), timeout=1
+                )
+                writer.close()
+                ready_in = time.monotonic() - started_at
+                break
+            except (OSError, asyncio.TimeoutError):
+                await asyncio.sleep(0.25)
+        
+        memory_mb = None
+        try:
+            memory_stats = (await self.client.container_stats(container_id)).get('memory_stats', {})
+            cgroup_stats = memory_stats.get('stats', {})
+            # rss on cgroup v1, anon on cgroup v2, total usage as a last resort
+            memory = cgroup_stats.get('rss') or cgroup_stats.get('anon') or memory_stats.get('usage')
+            if memory:
+                memory_mb = memory / (1024 * 1024)
+        except Exception as e:
+            print(f"Warning: Could not read container stats: {e}")
+        
+        ready = f"{ready_in:.1f}s" if ready_in is not None else "not ready after 60s"
+        memory_text = f"{memory_mb:.1f} MB" if memory_mb is not None else "unknown"
+        message = f"⏱ Server ready in {ready}, memory {memory_text} ({runtime_mode})"
+        print(f"[{project_id}] {message}")
+        try:
+            await asyncio.to_thread(self._append_build_log, project_id, message)
+        except Exception as e:
+            print(f"Warning: Could not save runtime footprint for {project_id}: {e}")
+    
+    def _append_build_log(self, project_id: str, message: str):
+        """Append a line to a project's saved build logs (runs in a thread)"""
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(models.Project)
+                .where(models.Project.name == project_id)
+                .values(build_logs=func.coalesce(models.Project.build_logs + "\n", "") + message)
+            )
+            db.commit()
+        finally:
+            db.close()
+    
+    async def _has_nextjs_runtime(self, project_id: str) -> bool:
+        """Check whether a Next.js server container exists for the project"""
+        try:
+            return await self.client.get_container(f"nextjs-{project_id}") is not None
+        except Exception:
+            return False
+    
+    async def _remove_nextjs_runtime(self, project_id: str) -> bool:
+        """Stop and remove the Next.js server container, if any"""
+        try:
+            await self.client.stop_container(f"nextjs-{project_id}")
+            await self.client.remove_container(f"nextjs-{project_id}")
+            return True
+        except DockerNotFound:
+            return False
+        except Exception as e:
+            print(f"Warning: Could not remove nextjs-{project_id}: {e}")
+            return False
     
-    def _create_nginx_proxy(self, project_id: str, port: int):
+    def _create_nginx_proxy(self, project_id: str, port: int, cache_version: int):
         """Create nginx reverse proxy configuration for Next.js app"""
         # Use /app/nginx-configs which is mounted from host
         nginx_config_dir = "/app/nginx-configs"
         os.makedirs(nginx_config_dir, exist_ok=True)
         
-        config_content = f"""server {{
+        # nginx only creates the last level of a cache path, so the cache
+        # lives directly in /var/cache/nginx which the image ships with
+        config_content = f"""# Per-project edge cache, only stores responses the app marks cacheable
+proxy_cache_path /var/cache/nginx/vylos_{project_id} levels=1:2 keys_zone=vylos_{project_id}:{settings.NGINX_CACHE_ZONE_SIZE} max_size={settings.NGINX_CACHE_MAX_SIZE} inactive={settings.NGINX_CACHE_INACTIVE} use_temp_path=off;
+
+server {{
     listen 80;
     server_name {project_id}{settings.DOMAIN_SUFFIX};
 
     # Use Docker's internal DNS resolver for dynamic resolution
     resolver 127.0.0.11 valid=10s;
     
+    # Cache status per request, read by the backend for hit ratio stats
+    access_log /var/log/nginx/vylos/{project_id}.cache.log vylos_cache;
+    access_log /var/log/nginx/access.log;
+    
     location / {{
         # Use variable to force dynamic DNS resolution
         set $upstream_endpoint nextjs-{project_id}:3000;
         proxy_pass http://$upstream_endpoint;
         
+        # Honors upstream Cache-Control/Expires; key is versioned per deploy
+        proxy_cache vylos_{project_id};
+        proxy_cache_key "v{cache_version}$scheme$host$request_uri";
+        proxy_cache_lock on;
+        proxy_cache_use_stale error timeout updating http_500 http_502 http_503 http_504;
+        proxy_cache_background_update on;
+        add_header X-Cache-Status $upstream_cache_status always;
+        
         proxy_http_version 1.1;
         proxy_set_header Upgrade $http_upgrade;
         proxy_set_header Connection 'upgrade';
@@ -386,19 +559,101 @@ class DeploymentService:
         with open(config_path, 'w') as f:
             f.write(config_content)
     
-    def _reload_nginx(self):
-        """Reload nginx to apply new configuration"""
+    def _create_nginx_static(self, project_id: str, fingerprints: dict):
+        """Create nginx server configuration for a static site"""
+        nginx_config_dir = "/app/nginx-configs"
+        os.makedirs(nginx_config_dir, exist_ok=True)
+        
+        config_path = os.path.join(nginx_config_dir, f"{project_id}.conf")
+        with open(config_path, 'w') as f:
+            f.write(self._render_nginx_static(project_id, fingerprints))
+    
+    @staticmethod
+    def _render_nginx_static(project_id: str, fingerprints: dict) -> str:
+        """
+        Render the nginx server block for a static site
+        
+        Args:
+            project_id: Project identifier
+            fingerprints: Fingerprinted 'dirs' and 'files' from scan_fingerprinted_assets
+            
+        Returns:
+            nginx configuration
+        """
+        brotli_directive = "\n    brotli_static on;" if settings.NGINX_BROTLI_STATIC else ""
+        immutable = 'add_header Cache-Control "public, max-age=31536000, immutable";'
+        
+        immutable_locations = "".join(
+            f"""
+    location ^~ "{path}" {{
+        {immutable}
+        try_files $uri =404;
+    }}
+""" for path in fingerprints['dirs']
+        ) + "".join(
+            f"""
+    location = "{path}" {{
+        {immutable}
+    }}
+""" for path in fingerprints['files']
+        )
+        
+        return f"""server {{
+    listen 80;
+    server_name {project_id}{settings.DOMAIN_SUFFIX};
+
+    root /var/www/html/{project_id};
+    index index.html index.htm;
+
+    # Serve the .gz/.br siblings written at deploy time
+    gzip_static on;
+    gzip_vary on;{brotli_directive}
+
+    # Fingerprinted assets never change under the same URL
+{immutable_locations}
+    # HTML entry points are revalidated so new deploys show up immediately
+    location ~* \\.html?$ {{
+        add_header Cache-Control "no-cache";
+        try_files $uri =404;
+    }}
+
+    # The SPA fallback is last, so it redirects internally to the HTML
+    # location above and is revalidated like any other entry point
+    location / {{
+        add_header Cache-Control "public, max-age={settings.STATIC_ASSET_MAX_AGE}";
+        try_files $uri $uri/ /index.html;
+    }}
+}}
+"""
+    
+    async def _precompress_assets(self, project_id: str, internal_work_dir: str):
+        """Write .gz siblings for compressible build output, and .br when nginx serves them"""
+        self.add_log(project_id, "🗜 Precompressing static assets...")
+        write_brotli = settings.NGINX_BROTLI_STATIC and brotli_available()
         try:
-            nginx_container = self.client.containers.get("vylos-nginx-1")
-            nginx_container.exec_run("nginx -s reload")
+            totals = await asyncio.to_thread(
+                precompress_directory, internal_work_dir, settings.COMPRESSION_WORKERS, write_brotli
+            )
         except Exception as e:
-            print(f"Warning: Could not reload nginx: {e}")
-            # Try alternative container name
-            try:
-                nginx_container = self.client.containers.get("vylos_nginx_1")
-                nginx_container.exec_run("nginx -s reload")
-            except:
-                print(f"Warning: Could not find nginx container")
+            # Uncompressed files are still servable
+            self.add_log(project_id, f"⚠ Precompression skipped: {e}")
+            return
+        
+        if not totals['files']:
+            self.add_log(project_id, "✓ No compressible assets found")
+            return
+        
+        summary = (
+            f"✓ Precompressed {totals['files']} assets: "
+            f"{totals['original'] // 1024} KB → {totals['gzip'] // 1024} KB gzip"
+        )
+        if write_brotli:
+            summary += f", {totals['brotli'] // 1024} KB brotli"
+        self.add_log(project_id, summary)
+    
+    async def _reload_nginx(self) -> bool:
+        """Request a batched nginx reload and wait for it to be applied"""
+        return await nginx_reload_coordinator.request_reload_async()
     
     def _get_available_port(self) -> int:
         """Get an available port for deployment"""
@@ -409,6 +664,42 @@ class DeploymentService:
             port = s.getsockname()[1]
         return port
     
+    def _is_static_export(self, work_dir: str) -> bool:
+        """
+        Check whether a Next.js project builds to a static export
+        
+        Args:
+            work_dir: Working directory containing the project
+            
+        Returns:
+            True if next.config sets output: 'export' or the build runs `next export`
+        """
+        import json
+        
+        for config_name in ("next.config.js", "next.config.mjs", "next.config.ts"):
+            config_path = os.path.join(work_dir, config_name)
+            if not os.path.exists(config_path):
+                continue
+            try:
+                with open(config_path, 'r') as f:
+                    # A commented out `output: 'export'` must not count
+                    if re.search(r"""output\s*:\s*['"`]export['"`]""", _strip_js_comments(f.read())):
+                        return True
+            except:
+                pass
+        
+        # Older Next.js versions export through a separate CLI command
+        package_json_path = os.path.join(work_dir, "package.json")
+        if os.path.exists(package_json_path):
+            try:
+                with open(package_json_path, 'r') as f:
+                    build_script = json.load(f).get('scripts', {}).get('build', '')
+                    return 'next export' in build_script
+            except:
+                pass
+        
+        return False
+    
     def _detect_framework(self, work_dir: str) -> str:
         """
         Detect the framework used in the project
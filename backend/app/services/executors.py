@@ -0,0 +1,293 @@
+"""
+Build Executors - Where and how a project's build step runs
+"""
+import abc
+import asyncio
+import os
+import shlex
+import shutil
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+from app.core.config import settings
+from app.services.build_farm import build_farm
+from app.utils.archive import iter_file, pack_directory, unpack_into, write_stream
+from app.utils.async_docker import AsyncDockerClient
+from app.utils.resources import build_profile
+
+# Exit code the tmpfs build script uses when the build failed on a full tmpfs
+TMPFS_FULL_EXIT_CODE = 75
+
+# Runs the build command ("$@") in a tmpfs copy of the workspace, then
+# replaces the workspace with the result. Next.js build caches are left
+# behind, and so is node_modules when a standalone server was traced.
+TMPFS_BUILD_SCRIPT = (
+    'cp -a /workspace/. /app/ && cd /app && "$@"; '
+    'rc=$?; '
+    'if [ $rc -ne 0 ]; then '
+    '  used=$(df -P /app | awk \'NR==2 {sub("%", "", $5); print $5}\'); '
+    '  if [ "$used" -ge 95 ]; then echo "tmpfs workspace is full ($used%)"; exit 75; fi; '
+    '  exit $rc; '
+    'fi; '
+    'exclude="--exclude=./.next/cache"; '
+    '[ -d /app/.next/standalone ] && exclude="$exclude --exclude=./node_modules"; '
+    'find /workspace -mindepth 1 -maxdepth 1 -exec rm -rf {} + && '
+    'tar -C /app $exclude -cf - . | tar -C /workspace -xf - && '
+    'echo "✓ Copied build output from tmpfs to the workspace"'
+)
+
+LogFn = Callable[[str], None]
+
+
+class BuildExecutor(abc.ABC):
+    """
+    Runs a project's build step
+
+    The workspace holds the cloned source when build() is called. When it
+    returns 0, the workspace must hold what should be deployed.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def can_build(self, work_dir: str) -> bool:
+        """Whether this executor can build the project in work_dir"""
+
+    @abc.abstractmethod
+    async def build(
+        self,
+        project_id: str,
+        command: str,
+        internal_work_dir: str,
+        host_work_dir: str,
+        log: LogFn
+    ) -> int:
+        """
+        Run the build step
+
+        Args:
+            project_id: Project identifier
+            command: Shell command to run in /app (container executors only)
+            internal_work_dir: Workspace path inside the backend container
+            host_work_dir: Workspace path on the local Docker host
+            log: Appends a line to the deployment log
+
+        Returns:
+            Exit code, 0 on success
+        """
+
+
+class InProcessExecutor(BuildExecutor):
+    """
+    Builds sites that need no toolchain without starting a container
+
+    Plain HTML projects (no package.json) are deployed as they were
+    cloned, so the build step only drops git metadata nginx should not
+    serve. Precompression and fingerprinting run afterwards as usual.
+    """
+
+    name = "in-process"
+
+    def can_build(self, work_dir: str) -> bool:
+        return not os.path.exists(os.path.join(work_dir, "package.json"))
+
+    async def build(
+        self,
+        project_id: str,
+        command: str,
+        internal_work_dir: str,
+        host_work_dir: str,
+        log: LogFn
+    ) -> int:
+        started = time.monotonic()
+        log("📄 No package.json - serving as static HTML")
+        await asyncio.to_thread(shutil.rmtree, os.path.join(internal_work_dir, ".git"), True)
+
+        elapsed = time.monotonic() - started
+        build_farm.record_build_time(self.name, elapsed)
+        log(f"⏱ Build step took {elapsed * 1000:.0f}ms (no container)")
+        return 0
+
+
+class DockerExecutor(BuildExecutor):
+    """
+    Runs builds in node:20-alpine containers on build farm nodes
+
+    Nodes that share the projects directory bind mount it, building in a
+    tmpfs copy when BUILD_TMPFS_SIZE is set. Other nodes receive the
+    workspace as a tar archive and send the built workspace back the
+    same way.
+    """
+
+    name = "docker"
+
+    def can_build(self, work_dir: str) -> bool:
+        return True
+
+    async def build(
+        self,
+        project_id: str,
+        command: str,
+        internal_work_dir: str,
+        host_work_dir: str,
+        log: LogFn
+    ) -> int:
+        async with build_farm.reserve(project_id, profile=build_profile) as node:
+            log(f"🖥 Building on node: {node.name}")
+
+            # npm cache stays on the node, so rebuilds there skip most downloads
+            cache_volume = {settings.BUILD_NPM_CACHE_VOLUME: {'bind': '/root/.npm', 'mode': 'rw'}}
+            started = time.monotonic()
+
+            if not node.shares_workspace:
+                mode = "archive"
+                exit_code = await self._run_remote(
+                    project_id, node.client, command, internal_work_dir, cache_volume, log
+                )
+            else:
+                mode = "disk"
+                if settings.BUILD_TMPFS_SIZE:
+                    mode = "tmpfs"
+                    exit_code = await self._run_container(
+                        project_id,
+                        node.client,
+                        ["sh", "-c", TMPFS_BUILD_SCRIPT, "build", *shlex.split(command)],
+                        volumes={host_work_dir: {'bind': '/workspace', 'mode': 'rw'}, **cache_volume},
+                        log=log,
+                        tmpfs={'/app': f"rw,exec,size={settings.BUILD_TMPFS_SIZE}"}
+                    )
+                    if exit_code == TMPFS_FULL_EXIT_CODE:
+                        # The workspace on disk is untouched until a tmpfs build succeeds
+                        log(f"⚠ Build outgrew the {settings.BUILD_TMPFS_SIZE} tmpfs workspace, retrying on disk")
+                        build_farm.record_build_time("tmpfs_spilled", time.monotonic() - started)
+                        mode = "disk"
+                        started = time.monotonic()
+
+                if mode == "disk":
+                    exit_code = await self._run_container(
+                        project_id,
+                        node.client,
+                        command,
+                        volumes={host_work_dir: {'bind': '/app', 'mode': 'rw'}, **cache_volume},
+                        log=log
+                    )
+
+            elapsed = time.monotonic() - started
+            build_farm.record_build_time(mode, elapsed)
+            log(f"⏱ Build step took {elapsed:.1f}s ({mode} workspace)")
+
+        if exit_code == 137:
+            log(f"❌ Build was killed, most likely for exceeding its memory limit ({settings.BUILD_MEMORY})")
+        return exit_code
+
+    async def _run_container(
+        self,
+        project_id: str,
+        client: AsyncDockerClient,
+        command: Union[str, List[str]],
+        volumes: dict,
+        log: LogFn,
+        tmpfs: Optional[Dict[str, str]] = None
+    ) -> int:
+        """
+        Run a one-off build container to completion, streaming its output
+
+        The container is limited to the build resource profile.
+
+        Args:
+            project_id: Project identifier (used to tag log lines)
+            client: Engine to run on
+            command: Shell command to run (string or argv list)
+            volumes: Bind mounts in docker-py format
+            log: Appends a line to the deployment log
+            tmpfs: tmpfs mounts as {path: mount options}
+
+        Returns:
+            Container exit code
+        """
+        host_config = build_profile.host_config()
+        if tmpfs:
+            host_config["Tmpfs"] = tmpfs
+        container_id = await client.run_container(
+            image="node:20-alpine",
+            command=command,
+            volumes=volumes,
+            host_config=host_config
+        )
+        try:
+            return await self._follow(project_id, client, container_id, log)
+        finally:
+            await client.remove_container(container_id, force=True)
+
+    async def _run_remote(
+        self,
+        project_id: str,
+        client: AsyncDockerClient,
+        command: str,
+        internal_work_dir: str,
+        volumes: dict,
+        log: LogFn
+    ) -> int:
+        """Run a build on an engine without access to the workspace"""
+        container_id = await client.create_container(
+            image="node:20-alpine",
+            command=command,
+            volumes=volumes,
+            working_dir="/app",
+            host_config=build_profile.host_config()
+        )
+        try:
+            tar_path = await asyncio.to_thread(pack_directory, internal_work_dir, "app")
+            try:
+                await client.put_archive(container_id, "/", iter_file(tar_path))
+            finally:
+                os.remove(tar_path)
+
+            await client.start_container(container_id)
+            exit_code = await self._follow(project_id, client, container_id, log)
+
+            if exit_code == 0:
+                log("📥 Fetching build output...")
+                tar_path = await write_stream(client.get_archive(container_id, "/app"))
+                try:
+                    await asyncio.to_thread(unpack_into, tar_path, internal_work_dir, "app")
+                finally:
+                    os.remove(tar_path)
+
+            return exit_code
+        finally:
+            await client.remove_container(container_id, force=True)
+
+    @staticmethod
+    async def _follow(project_id: str, client: AsyncDockerClient, container_id: str, log: LogFn) -> int:
+        """Stream a running build container's output and return its exit code"""
+        async for log_line in client.logs(container_id, follow=True):
+            log_line = log_line.strip()
+            print(f"[{project_id}] {log_line}")
+            log(log_line)
+
+        return await client.wait_container(container_id)
+
+
+docker_executor = DockerExecutor()
+in_process_executor = InProcessExecutor()
+
+# In order of preference, the first executor that can build a project wins
+STATIC_EXECUTORS: List[BuildExecutor] = [in_process_executor, docker_executor]
+
+
+def select_executor(work_dir: str, executors: List[BuildExecutor] = STATIC_EXECUTORS) -> BuildExecutor:
+    """
+    Pick the cheapest executor able to build a project
+
+    Args:
+        work_dir: Cloned workspace
+        executors: Candidates in order of preference
+
+    Returns:
+        The first executor whose can_build() accepts the workspace
+    """
+    for executor in executors:
+        if executor.can_build(work_dir):
+            return executor
+    raise Exception("No build executor can build this project")
@@ -0,0 +1,328 @@
+"""
+Nginx Service - Debounced configuration reloads and edge cache statistics
+"""
+import asyncio
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.utils.docker_client import get_docker_client
+
+
+class _ReloadBatch:
+    """A group of reload requests that will be applied by a single reload"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.success = False
+        self.requests = 0
+        # (loop, future) pairs for coroutines awaiting this batch
+        self.async_waiters = []
+
+
+class NginxReloadCoordinator:
+    """
+    Coalesces nginx reload requests issued within a debounce window
+
+    The first request opens a batch and arms a timer. Every request that
+    arrives before the timer fires joins that batch. When the timer fires,
+    the config is validated with `nginx -t` and, if valid, nginx is reloaded
+    once. All callers waiting on the batch are then woken with the result.
+    """
+
+    def __init__(self, debounce_seconds: float, timeout_seconds: float):
+        self.debounce_seconds = debounce_seconds
+        self.timeout_seconds = timeout_seconds
+
+        self._lock = threading.Lock()
+        # Serializes reloads so a new batch never overlaps a running one
+        self._reload_lock = threading.Lock()
+        self._pending: Optional[_ReloadBatch] = None
+        self._container_name: Optional[str] = None
+
+        # Metrics
+        self._reloads = 0
+        self._failures = 0
+        self._coalesced = 0
+        self._last_latency_ms: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+    def _join_batch(self) -> _ReloadBatch:
+        """Add a request to the pending batch, opening one if needed"""
+        with self._lock:
+            return self._join_batch_locked()
+
+    def _join_batch_locked(self) -> _ReloadBatch:
+        batch = self._pending
+        if batch is None:
+            batch = _ReloadBatch()
+            self._pending = batch
+            timer = threading.Timer(self.debounce_seconds, self._flush)
+            timer.daemon = True
+            timer.start()
+        batch.requests += 1
+        return batch
+
+    def request_reload(self, wait: bool = True) -> bool:
+        """
+        Request an nginx reload
+
+        Args:
+            wait: Block until the batched reload has been applied
+
+        Returns:
+            True if the reload succeeded (always True when not waiting)
+        """
+        batch = self._join_batch()
+
+        if not wait:
+            return True
+
+        if not batch.done.wait(self.timeout_seconds):
+            print("Warning: Timed out waiting for nginx reload")
+            return False
+        return batch.success
+
+    async def request_reload_async(self) -> bool:
+        """
+        Request an nginx reload from a coroutine and await the batched result
+
+        Returns:
+            True if the reload succeeded
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        with self._lock:
+            batch = self._join_batch_locked()
+            batch.async_waiters.append((loop, future))
+
+        try:
+            return await asyncio.wait_for(future, self.timeout_seconds)
+        except asyncio.TimeoutError:
+            print("Warning: Timed out waiting for nginx reload")
+            return False
+
+    def get_stats(self) -> dict:
+        """Get reload metrics"""
+        with self._lock:
+            return {
+                "reloads": self._reloads,
+                "failures": self._failures,
+                "coalesced_requests": self._coalesced,
+                "last_latency_ms": self._last_latency_ms,
+                "last_error": self._last_error,
+                "pending": self._pending.requests if self._pending else 0,
+            }
+
+    def _flush(self):
+        """Apply the pending batch with a single validated reload"""
+        with self._lock:
+            batch = self._pending
+            self._pending = None
+
+        if batch is None:
+            return
+
+        with self._reload_lock:
+            started = time.monotonic()
+            error = None
+            try:
+                container = self._get_nginx_container(get_docker_client())
+
+                exit_code, output = container.exec_run("nginx -t")
+                if exit_code != 0:
+                    raise Exception(
+                        f"nginx config test failed: {output.decode('utf-8', 'replace').strip()}"
+                    )
+
+                exit_code, output = container.exec_run("nginx -s reload")
+                if exit_code != 0:
+                    raise Exception(
+                        f"nginx reload failed: {output.decode('utf-8', 'replace').strip()}"
+                    )
+
+                batch.success = True
+            except Exception as e:
+                error = str(e)
+                print(f"Warning: Could not reload nginx: {e}")
+
+            latency_ms = round((time.monotonic() - started) * 1000, 1)
+
+        with self._lock:
+            self._reloads += 1
+            self._coalesced += batch.requests - 1
+            self._last_latency_ms = latency_ms
+            if error:
+                self._failures += 1
+                self._last_error = error
+
+        if batch.success:
+            print(f"✓ Reloaded nginx for {batch.requests} request(s) in {latency_ms}ms")
+
+        batch.done.set()
+        for loop, future in batch.async_waiters:
+            loop.call_soon_threadsafe(self._resolve, future, batch.success)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, success: bool):
+        if not future.done():
+            future.set_result(success)
+
+    def _get_nginx_container(self, client):
+        """Find the nginx container, remembering the name that worked"""
+        if self._container_name:
+            try:
+                return client.containers.get(self._container_name)
+            except Exception:
+                self._container_name = None
+
+        for name in settings.NGINX_CONTAINER_NAMES:
+            try:
+                container = client.containers.get(name)
+            except Exception:
+                continue
+            self._container_name = name
+            return container
+
+        raise Exception(
+            f"Could not find nginx container (tried: {', '.join(settings.NGINX_CONTAINER_NAMES)})"
+        )
+
+
+class EdgeCacheStats:
+    """
+    Per-project edge cache hit ratios
+
+    Each Next.js proxy config writes one `$upstream_cache_status` per
+    request to `{project}.cache.log`. Consumed lines are counted into
+    `{project}.cache.json` and the log is truncated, so it never grows
+    beyond the lines written since the last collection. The state file
+    is locked while it is updated, which keeps counts right across
+    restarts and between several backend processes. Lines nginx appends
+    between the last read and the truncation are not counted.
+    """
+
+    # Statuses that were answered from the cache
+    HIT_STATUSES = {"HIT", "STALE", "UPDATING", "REVALIDATED"}
+
+    def __init__(self, log_dir: str, collect_interval_seconds: float):
+        self.log_dir = log_dir
+        self.collect_interval_seconds = collect_interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def get_project_stats(self, project_name: str) -> dict:
+        """
+        Get cache statistics for a project
+
+        Args:
+            project_name: Project name (matches the nginx server name)
+
+        Returns:
+            Counts per cache status and the hit ratio
+        """
+        counts = self._consume(project_name)
+
+        hits = sum(counts.get(s, 0) for s in self.HIT_STATUSES)
+        lookups = sum(counts.values())
+        return {
+            "requests": lookups,
+            "hits": hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "statuses": counts,
+        }
+
+    def collect_all(self):
+        """Count and truncate every project's cache log"""
+        for path in glob.glob(os.path.join(self.log_dir, "*.cache.log")):
+            project_name = os.path.basename(path)[:-len(".cache.log")]
+            try:
+                self._consume(project_name)
+            except OSError as e:
+                print(f"⚠ Could not collect cache log for {project_name}: {e}")
+
+    def _consume(self, project_name: str) -> Dict[str, int]:
+        """Add lines appended to the project's cache log to its saved counts"""
+        log_path = os.path.join(self.log_dir, f"{project_name}.cache.log")
+        state_path = os.path.join(self.log_dir, f"{project_name}.cache.json")
+        if not os.path.exists(log_path) and not os.path.exists(state_path):
+            return {}
+
+        with open(state_path, "a+") as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            state_file.seek(0)
+            try:
+                state = json.loads(state_file.read() or "{}")
+            except ValueError:
+                state = {}
+            counts: Dict[str, int] = state.get("counts", {})
+            offset: int = state.get("offset", 0)
+
+            try:
+                log = open(log_path, "rb+")
+            except FileNotFoundError:
+                return counts
+
+            with log:
+                size = os.fstat(log.fileno()).st_size
+                if size < offset:
+                    # Truncated by someone else
+                    offset = 0
+                if size == offset:
+                    return counts
+
+                log.seek(offset)
+                for raw in log:
+                    if not raw.endswith(b"\n"):
+                        # Partial line still being written
+                        break
+                    offset += len(raw)
+                    status = raw.decode("ascii", "replace").strip()
+                    # "-" means the request never reached the cache (e.g. upgrades)
+                    if status and status != "-":
+                        counts[status] = counts.get(status, 0) + 1
+
+                # Save first: a crash before the truncation recounts lines,
+                # never loses the totals
+                state_file.seek(0)
+                state_file.truncate()
+                json.dump({"counts": counts, "offset": offset}, state_file)
+                state_file.flush()
+
+                # nginx appends with O_APPEND, it continues at the new end
+                if offset == os.fstat(log.fileno()).st_size:
+                    log.truncate(0)
+                    offset = 0
+                    state_file.seek(0)
+                    state_file.truncate()
+                    json.dump({"counts": counts, "offset": offset}, state_file)
+                    state_file.flush()
+
+        return counts
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.collect_interval_seconds)
+            await asyncio.to_thread(self.collect_all)
+
+    def start(self):
+        """Start collecting cache logs on the running loop (idempotent)"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+
+nginx_reload_coordinator = NginxReloadCoordinator(
+    debounce_seconds=settings.NGINX_RELOAD_DEBOUNCE_SECONDS,
+    timeout_seconds=settings.NGINX_RELOAD_TIMEOUT_SECONDS,
+)
+
+edge_cache_stats = EdgeCacheStats(
+    settings.NGINX_CACHE_LOG_DIR,
+    collect_interval_seconds=settings.NGINX_CACHE_LOG_COLLECT_SECONDS,
+)
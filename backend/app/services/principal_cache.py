@@ -0,0 +1,67 @@
+"""
+Principal Cache - Authenticated users without a database round trip
+"""
+from typing import Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.utils.ttl_cache import TTLCache
+
+# Column values of verified users, keyed by user id
+principal_cache: TTLCache[dict] = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+_USER_COLUMNS = [column.key for column in inspect(models.User).column_attrs]
+
+
+def get_cached_user(user_id: int) -> Optional[models.User]:
+    """
+    Get a cached user
+    
+    Args:
+        user_id: User ID from a verified token
+        
+    Returns:
+        A detached copy of the user (safe to read, not attached to any
+        session), None on a miss
+    """
+    values = principal_cache.get(user_id)
+    if values is None:
+        return None
+    return models.User(**values)
+
+
+def cache_user(user: models.User):
+    """Remember a user loaded from the database"""
+    principal_cache.set(user.id, {key: getattr(user, key) for key in _USER_COLUMNS})
+
+
+def invalidate_user(user_id: int):
+    """Forget a user so the next request reloads it"""
+    principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context):
+    """Note users changed or deleted in this transaction"""
+    changed: Set[int] = session.info.setdefault("changed_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.User) and obj.id is not None:
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session):
+    """Drop changed users once the change is visible to other sessions"""
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session):
+    session.info.pop("changed_user_ids", None)
@@ -1,8 +1,11 @@
 """
 Project Service - Business logic for project management
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import Insert, aggregate_order_by, insert
+from sqlalchemy.orm import defer, load_only
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.db import models
@@ -13,24 +16,141 @@ class ProjectService:
     """Project management service"""
     
     @staticmethod
-    def get_user_projects(db: Session, user_id: int) -> List[models.Project]:
+    async def get_user_projects(
+        db: AsyncSession,
+        user_id: int,
+        status: Optional[str] = None,
+        framework: Optional[str] = None,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[models.Project]:
         """
-        Get all projects for a user
+        Get a user's projects, oldest first
+        
+        Build logs are not loaded unless requested in `fields`.
         
         Args:
             db: Database session
             user_id: User ID
+            status: Only projects with this status
+            framework: Only projects with this framework
+            after_id: Only projects after this ID (keyset pagination)
+            limit: Maximum number of projects
+            fields: Columns to load, all but build_logs when omitted
             
         Returns:
             List of user's projects
         """
-        return db.query(models.Project).filter(
-            models.Project.owner_id == user_id
-        ).all()
+        query = select(models.Project).where(models.Project.owner_id == user_id)
+        if status is not None:
+            query = query.where(models.Project.status == status)
+        if framework is not None:
+            query = query.where(models.Project.framework == framework)
+        if after_id is not None:
+            query = query.where(models.Project.id > after_id)
+        
+        if fields is not None:
+            columns = [getattr(models.Project, field) for field in fields]
+            query = query.options(load_only(*columns, raiseload=True))
+        else:
+            query = query.options(defer(models.Project.build_logs, raiseload=True))
+        
+        query = query.order_by(models.Project.id)
+        if limit is not None:
+            query = query.limit(limit)
+        
+        result = await db.execute(query)
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def get_user_projects_version(
+        db: AsyncSession,
+        user_id: int,
+        status: Optional[str] = None,
+        framework: Optional[str] = None
+    ) -> Tuple[int, Optional[str]]:
+        """
+        Get a value that changes whenever a user's project list does
+        
+        The digest covers every (id, revision) pair in ID order, so creating,
+        deleting or updating any project changes it.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            status: Only projects with this status
+            framework: Only projects with this framework
+            
+        Returns:
+            (project count, digest of project IDs and revisions)
+        """
+        pair = func.concat(models.Project.id, ":", models.Project.revision)
+        query = select(
+            func.count(models.Project.id),
+            func.md5(func.string_agg(pair, aggregate_order_by(literal_column("','"), models.Project.id)))
+        ).where(models.Project.owner_id == user_id)
+        if status is not None:
+            query = query.where(models.Project.status == status)
+        if framework is not None:
+            query = query.where(models.Project.framework == framework)
+        
+        result = await db.execute(query)
+        return tuple(result.one())
+    
+    @staticmethod
+    async def get_project_revision(
+        db: AsyncSession,
+        project_id: int,
+        user_id: int
+    ) -> Optional[int]:
+        """
+        Get a project's revision without loading the project
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            user_id: User ID for ownership verification
+            
+        Returns:
+            Revision if found and owned by user, None otherwise
+        """
+        result = await db.execute(
+            select(models.Project.revision).where(
+                models.Project.id == project_id,
+                models.Project.owner_id == user_id
+            )
+        )
+        return result.scalar()
+    
+    @staticmethod
+    async def get_project_statuses(
+        db: AsyncSession,
+        user_id: int,
+        names: Sequence[str]
+    ) -> Dict[str, dict]:
+        """
+        Get the stored status of several projects in one query
+        
+        Args:
+            db: Database session
+            user_id: User ID for ownership verification
+            names: Project names
+            
+        Returns:
+            {"status", "domain"} by project name, for projects owned by user
+        """
+        result = await db.execute(
+            select(models.Project.name, models.Project.status, models.Project.domain).where(
+                models.Project.owner_id == user_id,
+                models.Project.name.in_(names)
+            )
+        )
+        return {row.name: {"status": row.status, "domain": row.domain} for row in result}
     
     @staticmethod
-    def get_project_by_id(
-        db: Session, 
+    async def get_project_by_id(
+        db: AsyncSession, 
         project_id: int, 
         user_id: int
     ) -> Optional[models.Project]:
@@ -45,16 +165,17 @@ class ProjectService:
         Returns:
             Project model if found and owned by user, None otherwise
         """
-        project = db.query(models.Project).filter(
-            models.Project.id == project_id,
-            models.Project.owner_id == user_id
-        ).first()
-        
-        return project
+        result = await db.execute(
+            select(models.Project).where(
+                models.Project.id == project_id,
+                models.Project.owner_id == user_id
+            )
+        )
+        return result.scalars().first()
     
     @staticmethod
-    def create_project(
-        db: Session,
+    async def create_project(
+        db: AsyncSession,
         project_data: schemas.ProjectCreate,
         user_id: int
     ) -> models.Project:
@@ -70,40 +191,108 @@ class ProjectService:
             Created project model
             
         Raises:
-            HTTPException: If project name already exists for user
+            HTTPException: If the project name is already taken
         """
-        # Check if project name exists for this user
-        existing = db.query(models.Project).filter(
-            models.Project.owner_id == user_id,
-            models.Project.name == project_data.name
-        ).first()
+        # Insert unless the name is taken, in one round trip
+        result = await db.execute(
+            insert(models.Project)
+            .values(
+                name=project_data.name,
+                description=project_data.description,
+                repo_url=project_data.git_url,
+                branch=project_data.branch,
+                framework="React",  # Default, can be auto-detected
+                status="Queued",
+                owner_id=user_id
+            )
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(models.Project)
+        )
+        new_project = result.scalars().first()
         
-        if existing:
+        if new_project is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Project name already exists"
             )
         
-        # Create project
-        new_project = models.Project(
-            name=project_data.name,
-            description=project_data.description,
-            repo_url=project_data.git_url,
-            branch=project_data.branch,
-            framework="React",  # Default, can be auto-detected
-            status="Queued",
-            owner_id=user_id
+        await db.commit()
+        
+        return new_project
+    
+    @staticmethod
+    def deploy_upsert_statement(name: str, repo_url: str, owner_id: int) -> Insert:
+        """
+        Build the statement that marks a project as Building, creating it if needed
+        
+        One round trip replaces a lookup followed by an insert, and two
+        concurrent deploys of a new project cannot both insert it. Result
+        rows are (project, created), created is False if the project
+        already existed. No row is returned when another user owns the
+        name. Execute with populate_existing so an already loaded project
+        is refreshed.
+        
+        Args:
+            name: Project name
+            repo_url: Repository being deployed
+            owner_id: Owner user ID
+            
+        Returns:
+            INSERT ... ON CONFLICT (name) DO UPDATE ... WHERE same owner ... RETURNING
+        """
+        stmt = insert(models.Project).values(
+            name=name,
+            repo_url=repo_url,
+            status="Building",
+            owner_id=owner_id
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={
+                "status": stmt.excluded.status,
+                "repo_url": stmt.excluded.repo_url,
+                # onupdate defaults do not apply to ON CONFLICT updates
+                "revision": models.Project.revision + 1,
+            },
+            where=models.Project.owner_id == stmt.excluded.owner_id
         )
+        # xmax is 0 for a freshly inserted row
+        return stmt.returning(models.Project, literal_column("xmax = 0").label("created"))
+    
+    @staticmethod
+    async def start_deploy(
+        db: AsyncSession,
+        name: str,
+        repo_url: str,
+        owner_id: int
+    ) -> Optional[Tuple[models.Project, bool]]:
+        """
+        Mark a project as Building, creating it if needed, and commit
         
-        db.add(new_project)
-        db.commit()
-        db.refresh(new_project)
+        Args:
+            db: Database session
+            name: Project name
+            repo_url: Repository being deployed
+            owner_id: Owner user ID
+            
+        Returns:
+            (project, created), or None if another user owns the name
+        """
+        result = await db.execute(
+            ProjectService.deploy_upsert_statement(name, repo_url, owner_id),
+            execution_options={"populate_existing": True}
+        )
+        row = result.one_or_none()
+        if row is None:
+            await db.rollback()
+            return None
         
-        return new_project
+        await db.commit()
+        return tuple(row)
     
     @staticmethod
-    def update_project_status(
-        db: Session,
+    async def update_project_status(
+        db: AsyncSession,
         project: models.Project,
         status: str,
         domain: Optional[str] = None,
@@ -131,39 +320,7 @@ class ProjectService:
             setattr(project, 'build_logs', build_logs)
         
         if commit:
-            db.commit()
-            db.refresh(project)
+            await db.commit()
+            await db.refresh(project)
         
         return project
-    
-    @staticmethod
-    def check_project_ownership(
-        project_name: str,
-        user_id: int,
-        db: Session
-    ) -> bool:
-        """
-        Check if a project name is already taken by another user
-        
-        Args:
-            project_name: Project name to check
-            user_id: Current user ID
-            db: Database session
-            
-        Returns:
-            True if name is available or owned by user, False if taken by another user
-            
-        Raises:
-            HTTPException: If project name is taken by another user
-        """
-        existing = db.query(models.Project).filter(
-            models.Project.name == project_name
-        ).first()
-        
-        if existing and getattr(existing, 'owner_id') != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Project name already taken by another user"
-            )
-        
-        return True
@@ -0,0 +1,466 @@
+"""
+Runtime Service - Keeps Next.js server containers in their desired state
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from docker import errors as docker_errors
+
+from app.core.config import settings
+from app.core.constants import PROJECT_STATUS_FAILED, PROJECT_STATUS_LIVE
+from app.db import models
+from app.db.session import SessionLocal
+from app.services.status_cache import status_cache
+from app.utils.docker_client import create_docker_client, get_docker_client
+
+
+RUNTIME_CONTAINER_PREFIX = "nextjs-"
+RUNTIME_NETWORK = "vylos_vylos_network"
+
+
+def ensure_network(client, container, network) -> bool:
+    """
+    Make sure a container is attached to the current vylos network
+
+    Containers created before the compose network was recreated still point
+    at the old network ID and cannot start until they are reattached.
+
+    Args:
+        client: Docker client
+        container: Container to check
+        network: Current vylos network
+
+    Returns:
+        True if the container had to be reconnected
+    """
+    networks = container.attrs['NetworkSettings']['Networks']
+
+    current = networks.get(RUNTIME_NETWORK)
+    if current and current.get('NetworkID') == network.id:
+        return False
+
+    # Disconnect from all old/invalid networks and connect to current network
+    for old_network_name in list(networks.keys()):
+        try:
+            old_net = client.networks.get(old_network_name)
+            old_net.disconnect(container, force=True)
+        except Exception as e:
+            print(f"    Could not disconnect from {old_network_name}: {e}")
+
+    network.connect(container)
+    return True
+
+
+def _container_name(container) -> str:
+    """Get a container's name from full or sparse attributes"""
+    if container.attrs.get('Name'):
+        return container.attrs['Name'].lstrip('/')
+    return container.attrs['Names'][0].lstrip('/')
+
+
+class RestoreProgress:
+    """Thread-safe progress of the startup container restoration"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.completed = 0
+        self.started = 0
+        self.already_running = 0
+        self.failed = 0
+        self.in_progress = 0
+        self.durations_ms: List[float] = []
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+
+    def begin(self, total: int):
+        with self._lock:
+            self.total = total
+            self.started_at = datetime.utcnow()
+
+    def container_started(self):
+        with self._lock:
+            self.in_progress += 1
+
+    def container_finished(self, outcome: str, duration_ms: float):
+        with self._lock:
+            self.in_progress -= 1
+            self.completed += 1
+            self.durations_ms.append(duration_ms)
+            if outcome == "started":
+                self.started += 1
+            elif outcome == "running":
+                self.already_running += 1
+            else:
+                self.failed += 1
+
+    def finish(self, error: Optional[str] = None):
+        with self._lock:
+            self.finished_at = datetime.utcnow()
+            self.error = error
+
+    def snapshot(self) -> dict:
+        """Get a JSON-serializable view of the progress"""
+        with self._lock:
+            durations = self.durations_ms
+            end = self.finished_at or datetime.utcnow()
+            return {
+                "total": self.total,
+                "completed": self.completed,
+                "started": self.started,
+                "already_running": self.already_running,
+                "failed": self.failed,
+                "in_progress": self.in_progress,
+                "percent": round(100 * self.completed / self.total, 1) if self.total else 100.0,
+                "done": self.finished_at is not None,
+                "elapsed_seconds": (
+                    round((end - self.started_at).total_seconds(), 2) if self.started_at else None
+                ),
+                "avg_container_ms": round(sum(durations) / len(durations), 1) if durations else None,
+                "max_container_ms": max(durations) if durations else None,
+                "error": self.error,
+            }
+
+
+restore_progress = RestoreProgress()
+
+
+def _recent_activity() -> Dict[str, datetime]:
+    """Get the last activity time for every project, used as restore priority"""
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            models.Project.name,
+            models.Project.last_deployed_at,
+            models.Project.created_at,
+        ).all()
+    finally:
+        db.close()
+    return {name: last_deployed_at or created_at or datetime.min for name, last_deployed_at, created_at in rows}
+
+
+def _restore_container(client, container, network, progress: RestoreProgress):
+    """Reattach and start one stopped container, recording how long it took"""
+    name = _container_name(container)
+    progress.container_started()
+    started = time.monotonic()
+    outcome = "failed"
+
+    try:
+        if container.status == "running":
+            outcome = "running"
+        else:
+            if ensure_network(client, container, network):
+                print(f"  {name}: reconnected to {RUNTIME_NETWORK}")
+            container.start()
+            outcome = "started"
+    except Exception as e:
+        print(f"  ✗ {name}: {e}")
+
+    duration_ms = round((time.monotonic() - started) * 1000, 1)
+    progress.container_finished(outcome, duration_ms)
+    print(f"  {'✓' if outcome != 'failed' else '✗'} {name}: {outcome} in {duration_ms}ms")
+
+
+def restore_runtime_containers(
+    client=None,
+    max_workers: Optional[int] = None,
+    progress: RestoreProgress = restore_progress
+):
+    """
+    Start existing stopped Next.js containers - NO automatic rebuilds
+
+    Containers are restored on a bounded thread pool, most recently active
+    projects first.
+
+    Args:
+        client: Docker client (a fake client can be passed for testing)
+        max_workers: Pool size, defaults to RESTORE_CONCURRENCY
+        progress: Progress tracker to report into
+    """
+    try:
+        client = client or get_docker_client()
+
+        # Sparse listing avoids an inspect call per container
+        containers = client.containers.list(
+            all=True, sparse=True, filters={"name": RUNTIME_CONTAINER_PREFIX}
+        )
+        if not containers:
+            progress.begin(0)
+            progress.finish()
+            print("No Next.js containers to restore")
+            return
+
+        try:
+            network = client.networks.get(RUNTIME_NETWORK)
+        except docker_errors.NotFound:
+            progress.begin(len(containers))
+            progress.finish(f"{RUNTIME_NETWORK} not found")
+            print(f"⚠ {RUNTIME_NETWORK} not found - containers cannot start")
+            return
+
+        activity = _recent_activity()
+        containers.sort(
+            key=lambda c: activity.get(_container_name(c)[len(RUNTIME_CONTAINER_PREFIX):], datetime.min),
+            reverse=True,
+        )
+
+        progress.begin(len(containers))
+        print(f"Restoring {len(containers)} Next.js containers")
+
+        # The executor queue is FIFO, so submission order is restore priority
+        with ThreadPoolExecutor(
+            max_workers=max_workers or settings.RESTORE_CONCURRENCY,
+            thread_name_prefix="restore",
+        ) as pool:
+            for container in containers:
+                pool.submit(_restore_container, client, container, network, progress)
+
+        progress.finish()
+        snapshot = progress.snapshot()
+        print(
+            f"Restoration complete: {snapshot['started']} started, "
+            f"{snapshot['already_running']} already running, {snapshot['failed']} failed "
+            f"in {snapshot['elapsed_seconds']}s"
+        )
+    except Exception as e:
+        progress.finish(str(e))
+        print(f"Error during container restoration: {e}")
+
+
+class _RuntimeState:
+    """Desired and observed state of one project's server container"""
+
+    def __init__(self, desired_running: bool):
+        self.desired_running = desired_running
+        self.actual = "unknown"
+        self.restarts = []
+        self.last_event: Optional[str] = None
+        self.last_event_at: Optional[float] = None
+
+
+class RuntimeReconciler:
+    """
+    Reconciles Next.js server containers against Live projects
+
+    A background thread follows the Docker events stream. When a container
+    that should be running dies, stops or is OOM-killed, the project is
+    marked Failed and, unless Docker's own restart policy brings it back,
+    the container is reattached to the network and restarted. Every
+    (re)connect to the events stream starts with a full resync so events
+    missed while disconnected are not lost.
+    """
+
+    WATCHED_EVENTS = ["die", "oom", "start", "stop"]
+
+    def __init__(
+        self,
+        grace_seconds: float,
+        max_restarts: int,
+        restart_window_seconds: float
+    ):
+        self.grace_seconds = grace_seconds
+        self.max_restarts = max_restarts
+        self.restart_window_seconds = restart_window_seconds
+
+        self._lock = threading.Lock()
+        self._states: Dict[str, _RuntimeState] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._client = None
+
+    def start(self):
+        """Start following Docker events in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="runtime-reconciler", daemon=True)
+        self._thread.start()
+
+    def set_desired(self, project_name: str, running: bool):
+        """
+        Record whether a project's server container should be running
+
+        Deployments clear this while they replace the container so the
+        reconciler does not fight them.
+
+        Args:
+            project_name: Project name
+            running: Whether the container should be running
+        """
+        with self._lock:
+            state = self._states.get(project_name)
+            if state is None:
+                self._states[project_name] = _RuntimeState(running)
+            else:
+                state.desired_running = running
+                if running:
+                    state.restarts = []
+
+    def get_stats(self) -> dict:
+        """Get a summary of the desired-vs-actual table"""
+        with self._lock:
+            desired = [s for s in self._states.values() if s.desired_running]
+            return {
+                "desired_running": len(desired),
+                "running": sum(1 for s in desired if s.actual == "running"),
+                "diverged": sum(1 for s in desired if s.actual != "running"),
+                "restarts": sum(len(s.restarts) for s in self._states.values()),
+            }
+
+    def _run(self):
+        """Follow the events stream forever, reconnecting on errors"""
+        backoff = 1
+        while True:
+            try:
+                # Dedicated client: the events stream holds its connection open
+                self._client = create_docker_client()
+                self._resync()
+                backoff = 1
+
+                events = self._client.events(
+                    decode=True,
+                    filters={"type": "container", "event": self.WATCHED_EVENTS},
+                )
+                for event in events:
+                    self._handle_event(event)
+            except Exception as e:
+                print(f"Runtime reconciler disconnected: {e}")
+
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+    def _resync(self):
+        """Rebuild the state table from the DB and the containers on the host"""
+        db = SessionLocal()
+        try:
+            live_names = {
+                name for (name,) in db.query(models.Project.name).filter(
+                    models.Project.status == PROJECT_STATUS_LIVE,
+                    models.Project.framework == "nextjs",
+                )
+            }
+        finally:
+            db.close()
+
+        containers = self._client.containers.list(
+            all=True, sparse=True, filters={"name": RUNTIME_CONTAINER_PREFIX}
+        )
+        actual = {}
+        for container in containers:
+            name = _container_name(container)
+            actual[name[len(RUNTIME_CONTAINER_PREFIX):]] = container.status
+
+        with self._lock:
+            for project_name, container_state in actual.items():
+                state = self._states.get(project_name)
+                if state is None:
+                    state = _RuntimeState(project_name in live_names)
+                    self._states[project_name] = state
+                state.actual = container_state
+
+            diverged = [
+                name for name, state in self._states.items()
+                if state.desired_running and state.actual not in ("running", "restarting")
+                and name in actual
+            ]
+
+        for project_name in diverged:
+            self._schedule_check(project_name, delay=0)
+
+    def _handle_event(self, event: dict):
+        """Update the table from one Docker event and react to failures"""
+        name = event.get('Actor', {}).get('Attributes', {}).get('name', '')
+        if not name.startswith(RUNTIME_CONTAINER_PREFIX):
+            return
+        project_name = name[len(RUNTIME_CONTAINER_PREFIX):]
+        action = event.get('Action') or event.get('status')
+
+        with self._lock:
+            state = self._states.get(project_name)
+            if state is None:
+                return
+            state.last_event = action
+            state.last_event_at = time.time()
+            if action == "start":
+                state.actual = "running"
+            elif action in ("die", "stop"):
+                state.actual = "exited"
+            desired_running = state.desired_running
+
+        if not desired_running:
+            return
+
+        if action == "start":
+            print(f"✓ {name} is running")
+            self._set_project_status(project_name, PROJECT_STATUS_LIVE)
+        elif action in ("die", "stop"):
+            print(f"✗ {name} {action} ({event.get('Actor', {}).get('Attributes', {}).get('exitCode', '?')})")
+            self._set_project_status(project_name, PROJECT_STATUS_FAILED)
+            # Give Docker's restart policy a chance before stepping in
+            self._schedule_check(project_name, delay=self.grace_seconds)
+
+    def _schedule_check(self, project_name: str, delay: float):
+        """Check a container after a delay and restart it if still down"""
+        timer = threading.Timer(delay, self._restart_if_down, args=(project_name,))
+        timer.daemon = True
+        timer.start()
+
+    def _restart_if_down(self, project_name: str):
+        """Restart a container that should be running but is not"""
+        with self._lock:
+            state = self._states.get(project_name)
+            if state is None or not state.desired_running:
+                return
+
+            now = time.time()
+            state.restarts = [t for t in state.restarts if now - t < self.restart_window_seconds]
+            if len(state.restarts) >= self.max_restarts:
+                print(f"✗ Giving up on {RUNTIME_CONTAINER_PREFIX}{project_name}: too many restarts")
+                return
+
+        container_name = f"{RUNTIME_CONTAINER_PREFIX}{project_name}"
+        try:
+            container = self._client.containers.get(container_name)
+            if container.status in ("running", "restarting"):
+                return
+
+            with self._lock:
+                state.restarts.append(now)
+
+            network = self._client.networks.get(RUNTIME_NETWORK)
+            if ensure_network(self._client, container, network):
+                print(f"  Reattached {container_name} to {RUNTIME_NETWORK}")
+
+            container.start()
+            print(f"✓ Restarted {container_name}")
+        except docker_errors.NotFound:
+            # Container was removed, nothing left to reconcile
+            with self._lock:
+                self._states.pop(project_name, None)
+        except Exception as e:
+            print(f"✗ Could not restart {container_name}: {e}")
+
+    def _set_project_status(self, project_name: str, status: str):
+        """Persist a runtime-driven status change for a project"""
+        db = SessionLocal()
+        try:
+            db.query(models.Project).filter(
+                models.Project.name == project_name,
+                models.Project.status.in_([PROJECT_STATUS_LIVE, PROJECT_STATUS_FAILED]),
+            ).update({models.Project.status: status}, synchronize_session=False)
+            db.commit()
+            status_cache.update_if_cached(project_name, status)
+        except Exception as e:
+            print(f"Could not update status for {project_name}: {e}")
+        finally:
+            db.close()
+
+
+runtime_reconciler = RuntimeReconciler(
+    grace_seconds=settings.RECONCILE_GRACE_SECONDS,
+    max_restarts=settings.RECONCILE_MAX_RESTARTS,
+    restart_window_seconds=settings.RECONCILE_RESTART_WINDOW_SECONDS,
+)
@@ -0,0 +1,161 @@
+"""
+Status Cache - Live deployment status without database queries
+"""
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.constants import PROJECT_STATUS_FAILED, PROJECT_STATUS_LIVE
+from app.db import models
+from app.db.session import AsyncSessionLocal
+from app.utils.change_notifier import status_changes
+from app.utils.ttl_cache import TTLCache
+
+FINISHED_STATUSES = (PROJECT_STATUS_LIVE, PROJECT_STATUS_FAILED)
+
+
+class StatusCache:
+    """
+    Status, domain and owner of projects, keyed by project name
+
+    Entries of running deployments are kept until the deployment
+    finishes. Finished deployments and statuses read from the database
+    live in a TTL/LRU cache bounded by STATUS_CACHE_SIZE, so memory stays
+    flat however many projects are deployed. A miss reads the projects
+    table, which holds the truth after a restart.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self._active: Dict[str, dict] = {}
+        self._finished: TTLCache[dict] = TTLCache(maxsize, ttl_seconds)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._active_hits = 0
+        self._db_reads = 0
+
+    def _lookup(self, project_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._active.get(project_id)
+            if entry is not None:
+                self._active_hits += 1
+                return entry
+        return self._finished.get(project_id)
+
+    def set(
+        self,
+        project_id: str,
+        status: str,
+        domain: Optional[str] = None,
+        owner_id: Optional[int] = None
+    ):
+        """
+        Record a deployment's status and wake anyone waiting on it
+
+        Args:
+            project_id: Project name
+            status: New status
+            domain: Domain, kept from the previous entry when omitted
+            owner_id: Owner, kept from the previous entry when omitted
+        """
+        with self._lock:
+            previous = self._active.pop(project_id, None) or self._finished.peek(project_id) or {}
+            entry = {**previous, "status": status}
+            if domain:
+                entry["domain"] = domain
+            if owner_id is not None:
+                entry["owner_id"] = owner_id
+
+            if status in FINISHED_STATUSES:
+                self._finished.set(project_id, entry)
+            else:
+                self._finished.invalidate(project_id)
+                self._active[project_id] = entry
+        status_changes.notify(project_id)
+
+    def update_if_cached(self, project_id: str, status: str):
+        """Change the status of a cached project, e.g. after its container stopped"""
+        with self._lock:
+            cached = project_id in self._active or self._finished.peek(project_id) is not None
+        if cached:
+            self.set(project_id, status)
+
+    def fill(self, project_id: str, status: Optional[str], domain: Optional[str], owner_id: int):
+        """Remember a status read from the database"""
+        with self._lock:
+            if project_id in self._active:
+                return  # A running deployment knows better
+            self._finished.set(project_id, {"status": status, "domain": domain, "owner_id": owner_id})
+
+    def get_owned(self, project_ids: List[str], owner_id: int) -> Dict[str, dict]:
+        """
+        Get cached statuses of a user's projects, without reading the database
+
+        Args:
+            project_ids: Projects to look up
+            owner_id: Only entries of this user's projects are returned
+
+        Returns:
+            Status entries by project, projects not cached are left out
+        """
+        statuses = {}
+        for project_id in project_ids:
+            entry = self._lookup(project_id)
+            if entry is not None and entry.get("owner_id") == owner_id:
+                statuses[project_id] = entry
+        return statuses
+
+    async def get(self, project_id: str, owner_id: int) -> Optional[dict]:
+        """
+        Get a project's status, reading the database on a miss
+
+        Args:
+            project_id: Project name
+            owner_id: Owner of the project
+
+        Returns:
+            {"status", "domain", "owner_id"}, None if the user has no such project
+        """
+        entry = self._lookup(project_id)
+        if entry is not None and entry.get("owner_id") == owner_id:
+            return entry
+
+        self._db_reads += 1
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(models.Project.status, models.Project.domain).where(
+                    models.Project.name == project_id,
+                    models.Project.owner_id == owner_id
+                )
+            )
+            row = result.first()
+        if row is None:
+            return None
+
+        self.fill(project_id, row.status, row.domain, owner_id)
+        return {"status": row.status, "domain": row.domain, "owner_id": owner_id}
+
+    def get_stats(self) -> dict:
+        """Get cache size and hit/miss/eviction counters"""
+        finished = self._finished.get_stats()
+        hits = finished["hits"] + self._active_hits
+        lookups = hits + finished["misses"]
+        return {
+            "active": len(self._active),
+            "finished": finished["size"],
+            "maxsize": finished["maxsize"],
+            "ttl_seconds": finished["ttl_seconds"],
+            "hits": hits,
+            "misses": finished["misses"],
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "evictions": finished["evictions"],
+            "db_reads": self._db_reads,
+        }
+
+
+status_cache = StatusCache(
+    maxsize=settings.STATUS_CACHE_SIZE,
+    ttl_seconds=settings.STATUS_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,78 @@
+"""
+Tar Archive Utilities for moving build workspaces between Docker engines
+"""
+import asyncio
+import os
+import shutil
+import tarfile
+import tempfile
+from typing import AsyncIterator
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def pack_directory(src_dir: str, arcname: str) -> str:
+    """
+    Pack a directory into a temporary tar file
+
+    Args:
+        src_dir: Directory to pack
+        arcname: Name of the top-level directory inside the archive
+
+    Returns:
+        Path to the tar file (caller removes it)
+    """
+    fd, tar_path = tempfile.mkstemp(suffix=".tar")
+    os.close(fd)
+    with tarfile.open(tar_path, "w") as tar:
+        tar.add(src_dir, arcname=arcname)
+    return tar_path
+
+
+def unpack_into(tar_path: str, dest_dir: str, strip: str):
+    """
+    Replace dest_dir with the contents of an archive's top-level directory
+
+    Args:
+        tar_path: Tar file to extract
+        dest_dir: Directory to (re)create
+        strip: Top-level directory name to strip from member paths
+    """
+    if os.path.exists(dest_dir):
+        shutil.rmtree(dest_dir)
+    os.makedirs(dest_dir, exist_ok=True)
+
+    prefix = f"{strip}/"
+    with tarfile.open(tar_path, "r|") as tar:
+        for member in tar:
+            if member.name == strip:
+                continue
+            if not member.name.startswith(prefix):
+                continue
+            member.name = member.name[len(prefix):]
+            if member.islnk() and member.linkname.startswith(prefix):
+                member.linkname = member.linkname[len(prefix):]
+            try:
+                # The data filter rejects absolute paths, links escaping dest_dir, devices, etc.
+                tar.extract(member, dest_dir, filter="data")
+            except tarfile.FilterError as e:
+                print(f"Skipping unsafe archive member {member.name}: {e}")
+
+
+async def iter_file(path: str) -> AsyncIterator[bytes]:
+    """Read a file in chunks without blocking the event loop"""
+    with open(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def write_stream(chunks: AsyncIterator[bytes]) -> str:
+    """Spool an async byte stream to a temporary file, returning its path"""
+    fd, path = tempfile.mkstemp(suffix=".tar")
+    with os.fdopen(fd, "wb") as f:
+        async for chunk in chunks:
+            await asyncio.to_thread(f.write, chunk)
+    return path
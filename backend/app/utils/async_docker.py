@@ -0,0 +1,323 @@
+"""
+Async Docker Engine API Client
+
+Talks to the Docker Engine HTTP API directly over the unix socket (or TCP)
+with httpx, so container operations never occupy a thread.
+"""
+import json
+import os
+import shlex
+import ssl
+import struct
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import settings
+
+
+class DockerAPIError(Exception):
+    """Error response from the Docker Engine API"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Docker API error {status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+class DockerNotFound(DockerAPIError):
+    """Requested container, image or network does not exist"""
+
+
+def _split_command(command: Union[str, List[str], None]) -> Optional[List[str]]:
+    """Split a command string the same way docker-py does"""
+    if command is None or isinstance(command, list):
+        return command
+    return shlex.split(command)
+
+
+def _split_image(image: str) -> Tuple[str, str]:
+    """
+    Split an image reference into repository and tag
+
+    Only a colon after the last slash starts the tag, so registry ports
+    (registry:5000/app:tag) stay part of the repository. Digest references
+    are passed through whole.
+    """
+    if "@" in image:
+        return image, ""
+    repository, slash, name = image.rpartition("/")
+    name, colon, tag = name.partition(":")
+    return f"{repository}{slash}{name}", tag if colon else "latest"
+
+
+def _tls_context() -> ssl.SSLContext:
+    """
+    TLS context for remote engines, like the docker CLI's DOCKER_CERT_PATH
+
+    The daemon is verified against ca.pem and the client presents
+    cert.pem/key.pem when DOCKER_CERT_PATH is set. Otherwise the system
+    trust store is used.
+    """
+    cert_path = settings.DOCKER_CERT_PATH
+    if not cert_path:
+        return ssl.create_default_context()
+    context = ssl.create_default_context(cafile=os.path.join(cert_path, "ca.pem"))
+    context.load_cert_chain(os.path.join(cert_path, "cert.pem"), os.path.join(cert_path, "key.pem"))
+    return context
+
+
+class AsyncDockerClient:
+    """Minimal asyncio-native client for the Docker Engine API"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            base_url: unix:///path/to/docker.sock or tcp://host:port
+                      (defaults to DOCKER_HOST)
+            timeout: Timeout for non-streaming requests in seconds
+            transport: Transport to use instead of one built from base_url
+                       (e.g. a fake Engine for testing)
+        """
+        base_url = base_url or os.getenv('DOCKER_HOST') or 'unix:///var/run/docker.sock'
+        parsed = urlparse(base_url)
+
+        if parsed.scheme == "unix":
+            default_transport = httpx.AsyncHTTPTransport(uds=parsed.path)
+            http_base = "http://docker"
+        elif parsed.scheme == "https" or (parsed.scheme == "tcp" and settings.DOCKER_TLS_VERIFY):
+            default_transport = httpx.AsyncHTTPTransport(verify=_tls_context())
+            http_base = f"https://{parsed.netloc}"
+        elif parsed.scheme in ("tcp", "http"):
+            # Plain HTTP, the Engine API is unauthenticated (trusted networks only)
+            default_transport = httpx.AsyncHTTPTransport()
+            http_base = f"http://{parsed.netloc}"
+        else:
+            raise ValueError(f"Unsupported Docker host: {base_url}")
+
+        self.base_url = base_url
+        self.timeout = timeout if timeout is not None else settings.DOCKER_TIMEOUT_SECONDS
+        self._http = httpx.AsyncClient(
+            transport=transport or default_transport,
+            base_url=http_base,
+            timeout=self.timeout,
+        )
+
+    async def close(self):
+        await self._http.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request and raise DockerAPIError on error responses"""
+        response = await self._http.request(method, path, **kwargs)
+        if response.status_code >= 400:
+            self._raise_for_status(response, response.text)
+        return response
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response, body: str):
+        try:
+            message = json.loads(body).get("message", body)
+        except (ValueError, AttributeError):
+            message = body
+        if response.status_code == 404:
+            raise DockerNotFound(response.status_code, message)
+        raise DockerAPIError(response.status_code, message)
+
+    # --- Images ---
+
+    async def pull_image(self, image: str):
+        """Pull an image, consuming the progress stream until it finishes"""
+        repository, tag = _split_image(image)
+        params = {"fromImage": repository, "tag": tag}
+        async with self._http.stream("POST", "/images/create", params=params, timeout=None) as response:
+            if response.status_code >= 400:
+                self._raise_for_status(response, (await response.aread()).decode())
+            async for line in response.aiter_lines():
+                if line and '"error"' in line:
+                    raise DockerAPIError(500, json.loads(line).get("error", line))
+
+    # --- Containers ---
+
+    async def create_container(
+        self,
+        image: str,
+        command: Union[str, List[str], None] = None,
+        name: Optional[str] = None,
+        volumes: Optional[Dict[str, Dict[str, str]]] = None,
+        ports: Optional[Dict[str, int]] = None,
+        environment: Optional[Dict[str, str]] = None,
+        working_dir: Optional[str] = None,
+        network: Optional[str] = None,
+        restart_policy: Optional[Dict[str, Any]] = None,
+        host_config: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Create a container, pulling the image if it is missing
+
+        Arguments mirror docker-py's containers.run() so call sites read the same.
+
+        Returns:
+            Container ID
+        """
+        host = dict(host_config or {})
+        if volumes:
+            host["Binds"] = [f"{src}:{opts['bind']}:{opts.get('mode', 'rw')}" for src, opts in volumes.items()]
+        if ports:
+            host["PortBindings"] = {
+                container_port: [{"HostPort": str(host_port)}]
+                for container_port, host_port in ports.items()
+            }
+        if network:
+            host["NetworkMode"] = network
+        if restart_policy:
+            host["RestartPolicy"] = restart_policy
+
+        config: Dict[str, Any] = {"Image": image, "HostConfig": host}
+        if command is not None:
+            config["Cmd"] = _split_command(command)
+        if environment:
+            config["Env"] = [f"{k}={v}" for k, v in environment.items()]
+        if working_dir:
+            config["WorkingDir"] = working_dir
+        if ports:
+            config["ExposedPorts"] = {container_port: {} for container_port in ports}
+
+        params = {"name": name} if name else None
+        try:
+            response = await self._request("POST", "/containers/create", params=params, json=config)
+        except DockerNotFound:
+            # Image is not present locally yet
+            await self.pull_image(image)
+            response = await self._request("POST", "/containers/create", params=params, json=config)
+        return response.json()["Id"]
+
+    async def start_container(self, container_id: str):
+        await self._request("POST", f"/containers/{container_id}/start")
+
+    async def run_container(self, image: str, **kwargs) -> str:
+        """Create and start a detached container, returning its ID"""
+        container_id = await self.create_container(image, **kwargs)
+        try:
+            await self.start_container(container_id)
+        except Exception:
+            # Don't leave a created container behind holding the name
+            try:
+                await self.remove_container(container_id, force=True)
+            except DockerAPIError as e:
+                print(f"Warning: Could not remove container {container_id[:12]}: {e}")
+            raise
+        return container_id
+
+    async def wait_container(self, container_id: str) -> int:
+        """Wait for a container to exit and return its exit code"""
+        response = await self._request("POST", f"/containers/{container_id}/wait", timeout=None)
+        return response.json().get("StatusCode", 1)
+
+    async def stop_container(self, container_id: str, timeout: int = 10):
+        await self._request(
+            "POST", f"/containers/{container_id}/stop",
+            params={"t": timeout}, timeout=self.timeout + timeout,
+        )
+
+    async def remove_container(self, container_id: str, force: bool = True):
+        await self._request("DELETE", f"/containers/{container_id}", params={"force": int(force)})
+
+    async def inspect_container(self, container_id: str) -> Dict[str, Any]:
+        response = await self._request("GET", f"/containers/{container_id}/json")
+        return response.json()
+
+    async def get_container(self, name: str) -> Optional[Dict[str, Any]]:
+        """Inspect a container by name or ID, returning None if it does not exist"""
+        try:
+            return await self.inspect_container(name)
+        except DockerNotFound:
+            return None
+
+    async def container_stats(self, container_id: str) -> Dict[str, Any]:
+        response = await self._request(
+            "GET", f"/containers/{container_id}/stats", params={"stream": "false"}
+        )
+        return response.json()
+
+    async def logs(self, container_id: str, follow: bool = True) -> AsyncIterator[str]:
+        """
+        Stream a container's stdout/stderr line by line
+
+        Containers without a TTY use the multiplexed stream format: each frame
+        has an 8 byte header (stream type, 3 padding bytes, big-endian size).
+        TTY containers stream raw output.
+        """
+        tty = (await self.inspect_container(container_id)).get("Config", {}).get("Tty", False)
+        params = {"stdout": 1, "stderr": 1, "follow": int(follow)}
+        async with self._http.stream(
+            "GET", f"/containers/{container_id}/logs", params=params, timeout=None
+        ) as response:
+            if response.status_code >= 400:
+                self._raise_for_status(response, (await response.aread()).decode())
+            chunks = response.aiter_bytes() if tty else self._demux(response.aiter_bytes())
+            async for line in self._iter_lines(chunks):
+                yield line
+
+    async def put_archive(self, container_id: str, path: str, data: AsyncIterator[bytes]):
+        """Extract a streamed tar archive into a (possibly stopped) container"""
+        await self._request(
+            "PUT", f"/containers/{container_id}/archive",
+            params={"path": path},
+            content=data,
+            headers={"Content-Type": "application/x-tar"},
+            timeout=None,
+        )
+
+    async def get_archive(self, container_id: str, path: str) -> AsyncIterator[bytes]:
+        """Stream a tar archive of a path inside a container"""
+        async with self._http.stream(
+            "GET", f"/containers/{container_id}/archive", params={"path": path}, timeout=None
+        ) as response:
+            if response.status_code >= 400:
+                self._raise_for_status(response, (await response.aread()).decode())
+            async for chunk in response.aiter_bytes():
+                yield chunk
+
+    # --- Stream helpers ---
+
+    @staticmethod
+    async def _demux(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Strip multiplexed stream frame headers, yielding payloads"""
+        buffer = b""
+        async for chunk in chunks:
+            buffer += chunk
+            while len(buffer) >= 8:
+                _, size = struct.unpack(">BxxxL", buffer[:8])
+                if len(buffer) < 8 + size:
+                    break
+                yield buffer[8:8 + size]
+                buffer = buffer[8 + size:]
+
+    @staticmethod
+    async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+        """Reassemble complete lines from payload chunks"""
+        pending = b""
+        async for chunk in chunks:
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield line.decode("utf-8", "replace").rstrip("\r")
+        if pending:
+            yield pending.decode("utf-8", "replace").rstrip("\r")
+
+
+_async_client: Optional[AsyncDockerClient] = None
+
+
+def get_async_docker_client() -> AsyncDockerClient:
+    """Get the process-wide async Docker client, creating it on first use"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncDockerClient()
+    return _async_client
@@ -0,0 +1,58 @@
+"""
+Change Notifier - Wake coroutines when keys they watch change
+"""
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Hashable, Iterable, Iterator, List, Tuple
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ChangeNotifier:
+    """
+    Lets coroutines wait until any key in a set changes
+
+    notify() may be called from any thread. Register with watch() before
+    reading the state you compare against, so no change can slip in
+    between the read and the wait.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watchers: List[Tuple[frozenset, asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @contextmanager
+    def watch(self, keys: Iterable[Hashable]) -> Iterator[asyncio.Future]:
+        """
+        Watch keys for the duration of the block
+
+        Yields:
+            Future that completes on the first change to any of the keys
+        """
+        loop = asyncio.get_running_loop()
+        entry = (frozenset(keys), loop, loop.create_future())
+        with self._lock:
+            self._watchers.append(entry)
+        try:
+            yield entry[2]
+        finally:
+            with self._lock:
+                self._watchers.remove(entry)
+
+    def notify(self, key: Hashable):
+        """Wake everyone watching key"""
+        with self._lock:
+            matches = [(loop, future) for keys, loop, future in self._watchers if key in keys]
+        for loop, future in matches:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def __len__(self) -> int:
+        return len(self._watchers)
+
+
+# Project status, domain or build queue position changed (keyed by project name)
+status_changes = ChangeNotifier()
@@ -0,0 +1,130 @@
+"""
+Static Asset Precompression Utilities
+"""
+import gzip
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip siblings are always written
+    brotli = None
+
+
+# Text-like assets that benefit from compression
+COMPRESSIBLE_EXTENSIONS = {
+    ".html", ".htm", ".css", ".js", ".mjs", ".cjs", ".json", ".map",
+    ".svg", ".xml", ".txt", ".md", ".wasm", ".ico", ".ttf", ".otf", ".eot",
+    ".webmanifest",
+}
+
+# Files smaller than this are not worth an extra sibling
+MIN_COMPRESS_SIZE = 256
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def brotli_available() -> bool:
+    """Check whether brotli siblings can be produced"""
+    return brotli is not None
+
+
+def _get_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Get the shared compression process pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn avoids forking the multi-threaded API process
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _compress_file(path: str, write_brotli: bool = False) -> Dict[str, int]:
+    """
+    Write .gz (and .br when requested) siblings for a single file
+
+    Siblings are only kept when they are smaller than the original.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    result = {"original": len(data), "gzip": 0, "brotli": 0}
+
+    gz_data = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz_data) < len(data):
+        with open(f"{path}.gz", "wb") as f:
+            f.write(gz_data)
+        result["gzip"] = len(gz_data)
+
+    if write_brotli:
+        br_data = brotli.compress(data, quality=11)
+        if len(br_data) < len(data):
+            with open(f"{path}.br", "wb") as f:
+                f.write(br_data)
+            result["brotli"] = len(br_data)
+
+    return result
+
+
+def find_compressible_files(root: str) -> List[str]:
+    """
+    Find assets under root that should be precompressed
+
+    Args:
+        root: Build output directory
+
+    Returns:
+        List of absolute file paths
+    """
+    files = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            ext = os.path.splitext(filename)[1].lower()
+            if ext not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(dirpath, filename)
+            if os.path.islink(path) or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            files.append(path)
+    return files
+
+
+def precompress_directory(
+    root: str,
+    max_workers: Optional[int] = None,
+    write_brotli: bool = False
+) -> Dict[str, int]:
+    """
+    Precompress all compressible assets under root using a process pool
+
+    Args:
+        root: Build output directory
+        max_workers: Size of the process pool (defaults to CPU count)
+        write_brotli: Also write .br siblings. Quality 11 is slow, only ask
+            for them when nginx serves them (requires the brotli module)
+
+    Returns:
+        Totals: files, original bytes, gzip bytes, brotli bytes
+    """
+    totals = {"files": 0, "original": 0, "gzip": 0, "brotli": 0}
+    files = find_compressible_files(root)
+    if not files:
+        return totals
+
+    pool = _get_pool(max_workers)
+    write_brotli = write_brotli and brotli_available()
+    for result in pool.map(partial(_compress_file, write_brotli=write_brotli), files, chunksize=16):
+        totals["files"] += 1
+        totals["original"] += result["original"]
+        totals["gzip"] += result["gzip"] or result["original"]
+        totals["brotli"] += result["brotli"] or result["original"]
+
+    return totals
@@ -0,0 +1,104 @@
+"""
+Shared Docker Client
+"""
+import os
+import threading
+import time
+from typing import Optional
+
+import docker
+
+from app.core.config import settings
+
+
+_client: Optional[docker.DockerClient] = None
+_client_lock = threading.Lock()
+
+_healthy: Optional[bool] = None
+_last_error: Optional[str] = None
+_health_thread: Optional[threading.Thread] = None
+
+
+def create_docker_client() -> docker.DockerClient:
+    """
+    Create a new Docker client with a pooled transport
+
+    Only use this for long-lived streams (e.g. events) that would otherwise
+    pin a connection of the shared pool. Everything else should call
+    get_docker_client().
+    """
+    # Ensure DOCKER_HOST is set
+    if not os.getenv('DOCKER_HOST'):
+        os.environ['DOCKER_HOST'] = 'unix:///var/run/docker.sock'
+
+    return docker.from_env(
+        max_pool_size=settings.DOCKER_MAX_POOL_SIZE,
+        timeout=settings.DOCKER_TIMEOUT_SECONDS,
+    )
+
+
+def get_docker_client() -> docker.DockerClient:
+    """
+    Get the process-wide Docker client, creating it on first use
+
+    Creating the client negotiates the API version with the daemon, so the
+    first call blocks. Async code should use
+    app.utils.async_docker.get_async_docker_client().
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            try:
+                _client = create_docker_client()
+                print("✓ Docker client initialized successfully")
+            except Exception as e:
+                print(f"Failed to connect to Docker: {e}")
+                print(f"DOCKER_HOST: {os.getenv('DOCKER_HOST')}")
+                print(f"Socket exists: {os.path.exists('/var/run/docker.sock')}")
+                raise Exception(f"Could not connect to Docker daemon. Error: {str(e)}")
+    return _client
+
+
+def docker_is_healthy() -> bool:
+    """
+    Get the result of the last background health check
+
+    Returns True until a check has failed, so requests are never held up
+    waiting for the first check.
+    """
+    return _healthy is not False
+
+
+def get_docker_health() -> dict:
+    """Get the background health check state"""
+    return {"healthy": _healthy, "last_error": _last_error}
+
+
+def _health_loop():
+    """Ping the daemon periodically, off the request path"""
+    global _healthy, _last_error
+    while True:
+        try:
+            get_docker_client().ping()
+            if _healthy is False:
+                print("✓ Docker daemon reachable again")
+            _healthy = True
+            _last_error = None
+        except Exception as e:
+            if _healthy is not False:
+                print(f"⚠ Docker health check failed: {e}")
+            _healthy = False
+            _last_error = str(e)
+        time.sleep(settings.DOCKER_HEALTH_CHECK_INTERVAL_SECONDS)
+
+
+def start_docker_health_checks():
+    """Start the background health check thread (idempotent)"""
+    global _health_thread
+    if _health_thread and _health_thread.is_alive():
+        return
+    _health_thread = threading.Thread(target=_health_loop, name="docker-health", daemon=True)
+    _health_thread.start()
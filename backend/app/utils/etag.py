@@ -0,0 +1,49 @@
+"""
+ETag helpers for conditional GET requests
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+# Clients may reuse a response but must revalidate it first
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong ETag from the values a response depends on
+    
+    Args:
+        parts: Version values, e.g. a project ID and its revision
+        
+    Returns:
+        Quoted ETag
+    """
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names this ETag"""
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for an unchanged resource"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def set_etag(response: Response, etag: str):
+    """Attach the ETag to a full response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
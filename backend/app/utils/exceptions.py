@@ -4,9 +4,11 @@ Custom Exception Handlers
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
 import logging
 
+from app.utils.password_hasher import PasswordHasherBusy
+
 logger = logging.getLogger(__name__)
 
 
@@ -54,6 +56,52 @@ async def database_exception_handler(request: Request, exc: SQLAlchemyError):
     )
 
 
+async def pool_timeout_exception_handler(request: Request, exc: PoolTimeoutError):
+    """
+    Handle connection pool exhaustion
+    
+    Args:
+        request: FastAPI request
+        exc: Pool checkout timeout
+        
+    Returns:
+        JSON response asking the client to retry
+    """
+    logger.warning(f"Database pool exhausted: {str(exc)}")
+    
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+        content={
+            "message": "Database is busy",
+            "detail": "No database connection became available in time, try again shortly"
+        }
+    )
+
+
+async def password_hasher_busy_exception_handler(request: Request, exc: PasswordHasherBusy):
+    """
+    Handle a full password hashing queue
+    
+    Args:
+        request: FastAPI request
+        exc: Hasher busy exception
+        
+    Returns:
+        JSON response asking the client to retry
+    """
+    logger.warning(f"Password hashing rejected: {str(exc)}")
+    
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+        content={
+            "message": "Authentication is busy",
+            "detail": "Too many logins in progress, try again shortly"
+        }
+    )
+
+
 async def general_exception_handler(request: Request, exc: Exception):
     """
     Handle general exceptions
@@ -84,5 +132,7 @@ def setup_exception_handlers(app):
         app: FastAPI application instance
     """
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(PoolTimeoutError, pool_timeout_exception_handler)
+    app.add_exception_handler(PasswordHasherBusy, password_hasher_busy_exception_handler)
     app.add_exception_handler(SQLAlchemyError, database_exception_handler)
     app.add_exception_handler(Exception, general_exception_handler)
@@ -0,0 +1,176 @@
+"""
+Fingerprinted Asset Detection
+"""
+import json
+import os
+import re
+from typing import Dict, List, Optional, Set
+
+
+# webpack/CRA/Angular style: main.3f2a1c8e.js, 2.8a1b2c3d.chunk.js, app-4f9e2b1c0d.css
+HEX_HASH_RE = re.compile(
+    r"[.-](?=[0-9a-f]*[0-9])(?=[0-9a-f]*[a-f])[0-9a-f]{8,64}(?:\.chunk)?\.[A-Za-z0-9]+$"
+)
+# Vite/Rollup style base64url hashes: index-B3x_9aQz.js, vendor-Dk2fLq8w.css.
+# Hashes that happen to look like words (a capitalised name, a date, a
+# camera file number) are rejected: a missed hash only costs a revalidation,
+# a false one pins a stale file in browsers for a year.
+BASE64_HASH_RE = re.compile(
+    r"-(?=[A-Za-z0-9_-]*[0-9])(?=[A-Za-z0-9_-]*[a-z])(?=[A-Za-z0-9_-]*[A-Z])[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$"
+)
+
+# Any base64url token, only trusted for files a build manifest lists
+MANIFEST_HASH_RE = re.compile(
+    r"-(?=[A-Za-z0-9_-]*[0-9A-Z])[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$"
+)
+
+# Directories whose contents are content-addressed by convention
+IMMUTABLE_DIRS = ("_next/static",)
+
+# Where bundlers put hashed output (Vite assetsDir, CRA static/*). Without
+# a manifest, only names in these directories are checked for a hash.
+BUNDLER_DIRS = ("assets", "static/js", "static/css", "static/media")
+
+# Build manifests listing the files a bundler emitted
+VITE_MANIFESTS = (".vite/manifest.json", "manifest.json")
+CRA_MANIFEST = "asset-manifest.json"
+
+# Precompressed siblings share the caching rules of their original
+SIBLING_EXTENSIONS = (".gz", ".br")
+
+# Characters that cannot be safely emitted into an nginx location
+_UNSAFE_URI_CHARS = set('"\\$;{}\n\r')
+
+
+def _has_hash(name: str) -> bool:
+    return bool(HEX_HASH_RE.search(name) or BASE64_HASH_RE.search(name))
+
+
+def _in_dirs(rel_path: str, dirs) -> bool:
+    return any(rel_path.startswith(f"{d}/") for d in dirs)
+
+
+def _read_json(path: str):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_manifest_assets(root: str) -> Optional[Set[str]]:
+    """
+    Collect the files a bundler reports having emitted
+
+    Reads a Vite manifest (.vite/manifest.json, or manifest.json in Vite 4)
+    and CRA's asset-manifest.json.
+
+    Args:
+        root: Build output directory
+
+    Returns:
+        Paths relative to root, None if the build left no manifest
+    """
+    assets: Optional[Set[str]] = None
+
+    for name in VITE_MANIFESTS:
+        manifest = _read_json(os.path.join(root, name))
+        # A PWA web manifest is also called manifest.json, Vite's maps
+        # source modules to chunks that each have a "file"
+        if not isinstance(manifest, dict) or not manifest or not all(
+            isinstance(chunk, dict) and "file" in chunk for chunk in manifest.values()
+        ):
+            continue
+        assets = assets or set()
+        for chunk in manifest.values():
+            assets.add(chunk["file"])
+            assets.update(chunk.get("css", []))
+            assets.update(chunk.get("assets", []))
+
+    manifest = _read_json(os.path.join(root, CRA_MANIFEST))
+    if isinstance(manifest, dict) and isinstance(manifest.get("files"), dict):
+        assets = assets or set()
+        assets.update(
+            path.lstrip("/") for path in manifest["files"].values() if isinstance(path, str)
+        )
+
+    return assets
+
+
+def is_fingerprinted(rel_path: str, manifest_assets: Optional[Set[str]] = None) -> bool:
+    """
+    Check whether a build output file was given a content hash by the bundler
+
+    Files under _next/static are always content-addressed. With a build
+    manifest, a file must be listed in it and carry a hash in its name.
+    Without one, only hashed names in bundler output directories count.
+
+    Args:
+        rel_path: Path relative to the build output root, using '/'
+        manifest_assets: Result of load_manifest_assets()
+
+    Returns:
+        True if the file can be cached forever
+    """
+    if _in_dirs(rel_path, IMMUTABLE_DIRS):
+        return True
+    name = rel_path.rsplit("/", 1)[-1]
+    if manifest_assets is not None and rel_path in manifest_assets:
+        return _has_hash(name) or bool(MANIFEST_HASH_RE.search(name))
+    return _in_dirs(rel_path, BUNDLER_DIRS) and _has_hash(name)
+
+
+def scan_fingerprinted_assets(root: str) -> Dict[str, List[str]]:
+    """
+    Scan build output for fingerprinted assets
+
+    Directories that contain only fingerprinted files (recursively) are
+    reported as a whole so the generated config stays small. Fingerprinted
+    files living next to unhashed ones are reported individually.
+
+    Args:
+        root: Build output directory
+
+    Returns:
+        Dict with 'dirs' and 'files' as URI paths starting with '/'
+    """
+    manifest_assets = load_manifest_assets(root)
+    clean_dirs = {}
+    fingerprinted_files = {}
+
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        rel_dir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        rel_dir = "" if rel_dir == "." else rel_dir
+
+        matches = []
+        clean = True
+        for filename in filenames:
+            if filename.endswith(SIBLING_EXTENSIONS):
+                continue
+            rel_path = f"{rel_dir}/{filename}" if rel_dir else filename
+            if is_fingerprinted(rel_path, manifest_assets):
+                matches.append(rel_path)
+            else:
+                clean = False
+
+        children = [f"{rel_dir}/{d}" if rel_dir else d for d in dirnames]
+        clean = clean and all(clean_dirs.get(child, False) for child in children)
+        # The root is never cached wholesale, it holds the HTML entry points
+        clean = clean and bool(matches or children) and rel_dir != ""
+
+        clean_dirs[rel_dir] = clean
+        fingerprinted_files[rel_dir] = matches
+
+    dirs = []
+    files = []
+    for rel_dir, clean in clean_dirs.items():
+        parent = rel_dir.rsplit("/", 1)[0] if "/" in rel_dir else ""
+        if clean and rel_dir and not clean_dirs.get(parent, False):
+            dirs.append(f"/{rel_dir}/")
+        elif not clean:
+            files.extend(f"/{path}" for path in fingerprinted_files[rel_dir])
+
+    return {
+        "dirs": sorted(d for d in dirs if not _UNSAFE_URI_CHARS & set(d)),
+        "files": sorted(f for f in files if not _UNSAFE_URI_CHARS & set(f)),
+    }
@@ -0,0 +1,145 @@
+"""
+Password Hasher - bcrypt on a dedicated, bounded process pool
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_and_update_password
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+def _timed(fn: Callable, *args):
+    """Run fn in a worker and report how long the hash itself took"""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in worker processes, away from the event loop and threadpool
+
+    At most `workers` hashes run at once and `max_queue` more may wait.
+    Anything beyond that is rejected immediately with PasswordHasherBusy,
+    so a login burst degrades into fast 503s instead of stalling every
+    other endpoint.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+        # Metrics
+        self._completed = 0
+        self._rejected = 0
+        self._rehashed = 0
+        self._max_queue_depth = 0
+        self._total_hash_seconds = 0.0
+        self._total_wait_seconds = 0.0
+        self._max_hash_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Hashes waiting for a free worker"""
+        return max(0, self._in_flight - self.workers)
+
+    async def _submit(self, fn: Callable, *args):
+        if self._in_flight >= self.workers + self.max_queue:
+            self._rejected += 1
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        self._in_flight += 1
+        self._max_queue_depth = max(self._max_queue_depth, self.queue_depth)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, hash_seconds = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+        except BrokenProcessPool:
+            # A worker died, start a fresh pool for the next request
+            print("⚠ Password hashing pool broke, restarting it")
+            self._executor = None
+            raise
+        finally:
+            self._in_flight -= 1
+
+        self._completed += 1
+        self._total_hash_seconds += hash_seconds
+        self._total_wait_seconds += max(0.0, time.perf_counter() - started - hash_seconds)
+        self._max_hash_seconds = max(self._max_hash_seconds, hash_seconds)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password
+
+        Raises:
+            PasswordHasherBusy: If too many hashes are already queued
+        """
+        return await self._submit(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password, rehashing it when the configured cost changed
+
+        Returns:
+            (matches, new hash to store or None)
+
+        Raises:
+            PasswordHasherBusy: If too many hashes are already queued
+        """
+        valid, new_hash = await self._submit(verify_and_update_password, password, hashed_password)
+        if new_hash:
+            self._rehashed += 1
+        return valid, new_hash
+
+    def start(self):
+        """
+        Start the worker processes ahead of the first login
+
+        Workers are forked, call this before starting background threads.
+        """
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(time.sleep, 0)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> dict:
+        """Get hashing latency and queue counters"""
+        completed = self._completed
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self._max_queue_depth,
+            "completed": completed,
+            "rejected": self._rejected,
+            "rehashed": self._rehashed,
+            "avg_hash_ms": round(self._total_hash_seconds / completed * 1000, 1) if completed else None,
+            "max_hash_ms": round(self._max_hash_seconds * 1000, 1),
+            "avg_wait_ms": round(self._total_wait_seconds / completed * 1000, 1) if completed else None,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,83 @@
+"""
+Container Resource Limits
+"""
+import os
+import re
+from typing import Optional, Union
+
+from app.core.config import settings
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)b?\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+def parse_memory(value: Union[str, int, None]) -> Optional[int]:
+    """
+    Parse a Docker-style memory size ("512m", "2g", 1073741824) into bytes
+
+    Returns:
+        Size in bytes, or None if value is empty
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return value
+    match = _SIZE_RE.match(value)
+    if not match:
+        raise ValueError(f"Invalid memory size: {value}")
+    number, unit = match.groups()
+    return int(float(number) * _UNITS[unit.lower()])
+
+
+def host_memory() -> Optional[int]:
+    """Total physical memory of this host in bytes, if it can be determined"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+class ResourceProfile:
+    """CPU, memory and process limits applied to a container"""
+
+    def __init__(
+        self,
+        cpus: Optional[float] = None,
+        memory: Union[str, int, None] = None,
+        pids: Optional[int] = None
+    ):
+        """
+        Args:
+            cpus: CPU quota in cores (e.g. 1.5)
+            memory: Memory limit, swap included (e.g. "2g")
+            pids: Maximum number of processes
+        """
+        self.cpus = cpus
+        self.memory = parse_memory(memory)
+        self.pids = pids
+
+    def host_config(self) -> dict:
+        """Engine API HostConfig fields enforcing this profile"""
+        config = {}
+        if self.cpus:
+            config["NanoCpus"] = int(self.cpus * 1e9)
+        if self.memory:
+            config["Memory"] = self.memory
+            # Same as Memory, so the container cannot spill into swap
+            config["MemorySwap"] = self.memory
+        if self.pids:
+            config["PidsLimit"] = self.pids
+        return config
+
+    def to_dict(self) -> dict:
+        return {"cpus": self.cpus, "memory": self.memory, "pids": self.pids}
+
+
+# tmpfs pages are charged to the container's memory cgroup, so a RAM-backed
+# build workspace is added on top of the build's own memory
+build_profile = ResourceProfile(
+    settings.BUILD_CPUS,
+    parse_memory(settings.BUILD_MEMORY) + (parse_memory(settings.BUILD_TMPFS_SIZE) or 0),
+    settings.BUILD_PIDS_LIMIT,
+)
+runtime_profile = ResourceProfile(settings.RUNTIME_CPUS, settings.RUNTIME_MEMORY, settings.RUNTIME_PIDS_LIMIT)
@@ -3,24 +3,33 @@ Vylos - Main Application Entry Point
 """
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
-import docker
-from docker import errors as docker_errors
 import threading
 
 from app.core.config import settings
-from app.db.session import engine, SessionLocal
+from app.db.session import async_engine, engine
 from app.db import models
+from app.db.migrations import upgrade_schema
+from app.db.replica import read_router
 from app.api.v1.api import api_router
 from app.middleware.cors import setup_cors
 from app.utils.logging import setup_logging
 from app.utils.exceptions import setup_exception_handlers
+from app.utils.password_hasher import password_hasher
+from app.utils.docker_client import get_docker_health, start_docker_health_checks
+from app.services.nginx_service import edge_cache_stats
+from app.services.runtime_service import (
+    restore_progress,
+    restore_runtime_containers,
+    runtime_reconciler,
+)
 
 
 # Setup logging
 logger = setup_logging()
 
-# Create database tables
+# Create database tables and upgrade existing ones
 models.Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -42,92 +51,17 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
 def restore_nextjs_containers():
-    """Start existing stopped Next.js containers - NO automatic rebuilds"""
+    """Start existing stopped Next.js containers, then keep them reconciled"""
     print("=" * 50)
     print("STARTING CONTAINER RESTORATION")
     print("=" * 50)
     
-    try:
-        client = docker.from_env()
-        
-        # Get all existing nextjs containers (running or stopped)
-        containers = client.containers.list(all=True, filters={"name": "nextjs-"})
-        
-        if not containers:
-            print("No Next.js containers found")
-            logger.info("No Next.js containers to restore")
-            return
-        
-        print(f"Found {len(containers)} Next.js containers")
-        logger.info(f"Found {len(containers)} Next.js containers to restore")
-        
-        # Get the current vylos network
-        try:
-            vylos_network = client.networks.get("vylos_vylos_network")
-        except docker_errors.NotFound:
-            print("⚠ vylos_vylos_network not found - containers cannot start")
-            logger.error("vylos_vylos_network not found")
-            return
-        
-        for container in containers:
-            print(f"\n→ {container.name}: {container.status}")
-            
-            try:
-                if container.status != "running":
-                    # Check if container is on the correct network
-                    container.reload()  # Refresh container info
-                    networks = container.attrs['NetworkSettings']['Networks']
-                    
-                    # Check if connected to current vylos network (by ID, not just name)
-                    needs_reconnect = True
-                    if 'vylos_vylos_network' in networks:
-                        current_network_id = networks['vylos_vylos_network']['NetworkID']
-                        # Verify the network ID actually exists
-                        try:
-                            client.networks.get(current_network_id)
-                            needs_reconnect = False  # Network exists, no need to reconnect
-                        except docker_errors.NotFound:
-                            # Network ID doesn't exist, need to reconnect
-                            pass
-                    
-                    # Disconnect from old/invalid networks and connect to current network
-                    if needs_reconnect:
-                        print(f"  Reconnecting to vylos_vylos_network...")
-                        
-                        # Disconnect from all networks
-                        for old_network_name in list(networks.keys()):
-                            try:
-                                container.reload()
-                                old_net = client.networks.get(old_network_name)
-                                old_net.disconnect(container, force=True)
-                                print(f"    Disconnected from: {old_network_name}")
-                            except Exception as e:
-                                print(f"    Could not disconnect from {old_network_name}: {e}")
-                        
-                        # Connect to current network
-                        vylos_network.connect(container)
-                        print(f"  ✓ Connected to vylos_vylos_network")
-                    
-                    print(f"  Starting stopped container...")
-                    logger.info(f"Starting container: {container.name}")
-                    container.start()
-                    print(f"  ✓ Started")
-                    logger.info(f"✓ Started {container.name}")
-                else:
-                    print(f"  ✓ Already running")
-                    logger.info(f"✓ {container.name} already running")
-                    
-            except Exception as e:
-                print(f"  ✗ Error: {e}")
-                logger.error(f"Error starting {container.name}: {e}")
-        
-        print("\n" + "=" * 50)
-        print("RESTORATION COMPLETE")
-        print("=" * 50)
-        logger.info("Container restoration completed")
-        
-    except Exception as e:
-        logger.error(f"Error during container restoration: {e}")
+    restore_runtime_containers()
+    logger.info(f"Container restoration finished: {restore_progress.snapshot()}")
+    
+    # Keep runtime containers in sync with Docker events from now on
+    runtime_reconciler.start()
+    logger.info("Started runtime reconciler")
 
 
 @app.on_event("startup")
@@ -137,6 +71,18 @@ async def startup_event():
     print("STARTUP EVENT TRIGGERED")
     print("!" * 50 + "\n")
     
+    # Fork the bcrypt workers first, while no background threads are running
+    password_hasher.start()
+    
+    # Connect to Docker and keep checking its health off the request path
+    start_docker_health_checks()
+    
+    # Route reads to the replica while it is healthy and caught up
+    read_router.start()
+    
+    # Keep the per-project edge cache logs bounded
+    edge_cache_stats.start()
+    
     # Run in background thread to not block startup
     thread = threading.Thread(target=restore_nextjs_containers)
     thread.daemon = True
@@ -145,6 +91,13 @@ async def startup_event():
     print("Background thread started\n")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close pooled async database connections and hashing workers"""
+    await async_engine.dispose()
+    password_hasher.shutdown()
+
+
 @app.get("/", tags=["root"])
 async def root():
     """Root endpoint"""
@@ -163,7 +116,8 @@ async def health_check():
     return JSONResponse(
         content={
             "status": "healthy",
-            "version": settings.VERSION
+            "version": settings.VERSION,
+            "docker": get_docker_health()
         }
     )
 
@@ -0,0 +1,79 @@
+"""
+API Throughput Benchmark
+
+Fires concurrent authenticated requests at an endpoint and reports
+throughput and latency percentiles. Run it against the same deployment
+before and after a change to compare.
+
+Usage:
+    python scripts/benchmark_api.py --token <jwt> [--url URL] [--concurrency 50] [--requests 2000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def run(url: str, token: str, concurrency: int, total: int) -> dict:
+    """
+    Send `total` GET requests with `concurrency` in flight at once
+
+    Returns:
+        Throughput, error count and latency percentiles in milliseconds
+    """
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async with httpx.AsyncClient(
+        headers={"Authorization": f"Bearer {token}"},
+        limits=httpx.Limits(max_connections=concurrency),
+        timeout=30,
+    ) as client:
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/api/v1/projects/")
+    parser.add_argument("--token", required=True, help="JWT access token")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.token, args.concurrency, args.requests))
+    for key, value in result.items():
+        print(f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
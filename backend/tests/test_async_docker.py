@@ -0,0 +1,113 @@
+"""
+Tests for the async Docker Engine API client against a fake Engine
+"""
+import asyncio
+import json
+import struct
+
+import httpx
+
+from app.utils.async_docker import AsyncDockerClient
+
+
+def frame(payload: bytes, stream: int = 1) -> bytes:
+    """Multiplexed stream frame: stream type, 3 padding bytes, big-endian size"""
+    return struct.pack(">BxxxL", stream, len(payload)) + payload
+
+
+async def chunked(data: bytes, sizes):
+    """Yield data in chunks of the given sizes, then the rest"""
+    for size in sizes:
+        chunk, data = data[:size], data[size:]
+        yield chunk
+    if data:
+        yield data
+
+
+class FakeEngine:
+    """Records requests and answers them from a handler"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+
+    def client(self) -> AsyncDockerClient:
+        return AsyncDockerClient("tcp://docker:2375", transport=httpx.MockTransport(self._handle))
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.handler(request)
+
+
+def collect_logs(engine: FakeEngine) -> list:
+    async def run():
+        client = engine.client()
+        try:
+            return [line async for line in client.logs("abc")]
+        finally:
+            await client.close()
+    return asyncio.run(run())
+
+
+def logs_engine(body: bytes, sizes, tty: bool) -> FakeEngine:
+    def handler(request):
+        if request.url.path == "/containers/abc/json":
+            return httpx.Response(200, json={"Id": "abc", "Config": {"Tty": tty}})
+        assert request.url.path == "/containers/abc/logs"
+        return httpx.Response(200, content=chunked(body, sizes))
+    return FakeEngine(handler)
+
+
+def test_multiplexed_frames_split_across_chunks():
+    body = (
+        frame(b"installing\n")
+        + frame(b"warn: peer dep\n", stream=2)
+        + frame(b"built in ")
+        + frame(b"3.2s\nlast line")
+    )
+    # Split inside a header, inside a payload, and with several frames per chunk
+    engine = logs_engine(body, sizes=[3, 10, 1, 40], tty=False)
+
+    assert collect_logs(engine) == ["installing", "warn: peer dep", "built in 3.2s", "last line"]
+
+
+def test_tty_output_is_not_demultiplexed():
+    # Raw TTY bytes would be misread as frame headers by the demultiplexer
+    body = b"\x01\x00\x00\x00 starts like a header\r\nsecond line\r\n"
+    engine = logs_engine(body, sizes=[5, 7], tty=True)
+
+    assert collect_logs(engine) == ["\x01\x00\x00\x00 starts like a header", "second line"]
+
+
+def test_missing_image_is_pulled_before_retrying_create():
+    created = []
+
+    def handler(request):
+        if request.url.path == "/containers/create":
+            if not created:
+                created.append(request)
+                return httpx.Response(404, json={"message": "No such image: registry:5000/app:v2"})
+            return httpx.Response(201, json={"Id": "new-container"})
+        if request.url.path == "/images/create":
+            progress = b'{"status":"Pulling fs layer"}\n{"status":"Download complete"}\n'
+            return httpx.Response(200, content=chunked(progress, [12]))
+        raise AssertionError(f"Unexpected request {request.method} {request.url}")
+
+    engine = FakeEngine(handler)
+
+    async def run():
+        client = engine.client()
+        try:
+            return await client.create_container("registry:5000/app:v2", name="nextjs-site")
+        finally:
+            await client.close()
+
+    assert asyncio.run(run()) == "new-container"
+    assert [request.url.path for request in engine.requests] == [
+        "/containers/create", "/images/create", "/containers/create"
+    ]
+    pull = engine.requests[1]
+    assert pull.url.params["fromImage"] == "registry:5000/app"
+    assert pull.url.params["tag"] == "v2"
+    assert json.loads(engine.requests[2].content)["Image"] == "registry:5000/app:v2"
+    assert engine.requests[2].url.params["name"] == "nextjs-site"
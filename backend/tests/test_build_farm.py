@@ -0,0 +1,190 @@
+"""
+Tests for build admission and placement across several nodes
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+
+from app.api.v1.endpoints import deployments
+from app.db import schemas
+from app.services.build_farm import BuildFarm, BuildNode, DeploymentInProgress
+from app.services.project_service import ProjectService
+from app.utils.resources import ResourceProfile
+
+PROFILE = ResourceProfile(cpus=2, memory="2g")
+
+
+class FakeNodeClient:
+    """Stands in for a node's Docker client, placement must not call it"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def make_farm(*nodes) -> BuildFarm:
+    """Nodes as (name, capacity, cpus, memory)"""
+    farm = BuildFarm([
+        BuildNode(name, capacity=capacity, cpus=cpus, memory=memory)
+        for name, capacity, cpus, memory in nodes
+    ])
+    for node in farm.nodes.values():
+        node._client = FakeNodeClient(node.name)
+    return farm
+
+
+def test_admission_counts_room_on_every_node():
+    # "small" fits one build by CPU, "big" two by capacity
+    farm = make_farm(("small", 4, 2, "8g"), ("big", 2, 16, "32g"))
+
+    assert [farm.admit(name, PROFILE) for name in ("a", "b", "c")] == [True, True, True]
+    assert farm.admit("d", PROFILE) is False
+    assert farm.get_stats()["rejected"] == 1
+
+    farm.finish_deployment("a")
+    assert farm.admit("d", PROFILE) is True
+
+
+def test_duplicate_admission_is_rejected_until_the_deployment_finishes():
+    farm = make_farm(("node", 4, 16, "32g"))
+    farm.admit("site", PROFILE)
+
+    async def build():
+        async with farm.reserve("site", profile=PROFILE):
+            # Placed builds no longer hold an admission but are still in flight
+            with pytest.raises(DeploymentInProgress):
+                farm.admit("site", PROFILE)
+
+    asyncio.run(build())
+    with pytest.raises(DeploymentInProgress):
+        farm.admit("site", PROFILE)
+
+    farm.finish_deployment("site")
+    assert farm.admit("site", PROFILE) is True
+
+
+def test_placement_prefers_the_least_loaded_node_then_waits():
+    farm = make_farm(("one", 1, 16, "32g"), ("two", 2, 16, "32g"))
+
+    async def run():
+        placed = []
+        release = asyncio.Event()
+
+        async def build(project_id):
+            async with farm.reserve(project_id, profile=PROFILE) as node:
+                placed.append((project_id, node.client.name))
+                await release.wait()
+
+        tasks = [asyncio.create_task(build(f"p{index}")) for index in range(4)]
+        await asyncio.sleep(0.01)
+        queued = farm.queue_position("p3")
+        release.set()
+        await asyncio.gather(*tasks)
+        return placed, queued
+
+    placed, queued = asyncio.run(run())
+
+    assert sorted(node for _, node in placed[:3]) == ["one", "two", "two"]
+    assert placed[0][1] == "two"
+    assert queued == 1
+    assert placed[3][0] == "p3"
+    assert all(node.active == 0 for node in farm.nodes.values())
+
+
+def test_build_returns_to_its_last_node():
+    farm = make_farm(("one", 2, 16, "32g"), ("two", 2, 16, "32g"))
+
+    async def place(project_id):
+        async with farm.reserve(project_id, profile=PROFILE) as node:
+            return node.name
+
+    first = asyncio.run(place("site"))
+    # Load the other node less than this one, locality still wins
+    farm.nodes[first].active = 1
+    assert asyncio.run(place("site")) == first
+
+
+def test_reservation_is_released_when_the_build_raises():
+    farm = make_farm(("node", 1, 4, "4g"))
+
+    async def failing_build():
+        async with farm.reserve("site", profile=PROFILE):
+            raise RuntimeError("npm install failed")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(failing_build())
+
+    node = farm.nodes["node"]
+    assert (node.active, node.used_cpus, node.used_memory) == (0, 0, 0)
+    assert node.fits(PROFILE) == 1
+
+
+def test_build_that_no_node_can_fit_fails_fast():
+    farm = make_farm(("node", 4, 1, "1g"))
+
+    async def build():
+        async with farm.reserve("site", profile=PROFILE):
+            pass
+
+    with pytest.raises(Exception, match="No build node"):
+        asyncio.run(build())
+
+
+@pytest.fixture
+def deploy(monkeypatch):
+    """Call the deploy endpoint against a farm with one free build slot"""
+    farm = make_farm(("node", 1, 16, "32g"))
+    monkeypatch.setattr(deployments, "build_farm", farm)
+    monkeypatch.setattr(deployments, "docker_is_healthy", lambda: True)
+
+    started = {"result": (SimpleNamespace(id=7), True)}
+
+    async def start_deploy(db, name, repo_url, owner_id):
+        if isinstance(started["result"], Exception):
+            raise started["result"]
+        return started["result"]
+
+    monkeypatch.setattr(ProjectService, "start_deploy", staticmethod(start_deploy))
+
+    def call(project_id="site"):
+        request = schemas.DeploymentCreate(git_url="https://example.com/repo.git", project_id=project_id)
+        user = SimpleNamespace(id=1, email="dev@example.com")
+        return asyncio.run(deployments.deploy_project(request, BackgroundTasks(), db=None, current_user=user))
+
+    return SimpleNamespace(call=call, farm=farm, started=started)
+
+
+def test_deploy_rejects_a_project_already_deploying(deploy):
+    deploy.call("site")
+
+    with pytest.raises(HTTPException) as error:
+        deploy.call("site")
+    assert error.value.status_code == 409
+
+
+def test_deploy_returns_429_when_the_farm_is_full(deploy):
+    deploy.call("site")
+
+    with pytest.raises(HTTPException) as error:
+        deploy.call("other")
+    assert error.value.status_code == 429
+    assert int(error.value.headers["Retry-After"]) > 0
+
+
+def test_deploy_releases_admission_when_the_name_is_taken(deploy):
+    deploy.started["result"] = None
+
+    with pytest.raises(HTTPException) as error:
+        deploy.call("site")
+    assert error.value.status_code == 409
+    assert deploy.farm.get_stats()["admitted"] == 0
+
+
+def test_deploy_releases_admission_when_the_upsert_fails(deploy):
+    deploy.started["result"] = ConnectionError("database is down")
+
+    with pytest.raises(ConnectionError):
+        deploy.call("site")
+    assert deploy.farm.get_stats()["admitted"] == 0
+    assert deploy.farm.get_stats()["deploying"] == 0
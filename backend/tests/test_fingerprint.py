@@ -0,0 +1,93 @@
+"""
+Tests for fingerprinted asset detection
+"""
+import json
+import os
+
+import pytest
+
+from app.utils.fingerprint import is_fingerprinted, load_manifest_assets, scan_fingerprinted_assets
+
+
+@pytest.mark.parametrize("rel_path", [
+    "fonts/OpenSans-SemiBold.ttf",
+    "Inter-Variable.woff2",
+    "docs/report-20240101.pdf",
+    "img/photo-IMG_1234.jpg",
+    "assets/OpenSans-SemiBold.ttf",
+    "assets/report-20240101.pdf",
+    "assets/photo-IMG_1234.jpg",
+    "index.html",
+])
+def test_unhashed_names_are_not_fingerprinted(rel_path):
+    assert not is_fingerprinted(rel_path)
+
+
+@pytest.mark.parametrize("rel_path", [
+    "static/js/main.3f2a1c8e.js",
+    "static/js/2.8a1b2c3d.chunk.js",
+    "static/media/logo.6ce24c58023cc2f8fd88fe9d219db6c6.svg",
+    "assets/index-B3x_9aQz.js",
+    "_next/static/chunks/app.js",
+])
+def test_bundler_output_is_fingerprinted(rel_path):
+    assert is_fingerprinted(rel_path)
+
+
+def test_hashed_looking_names_outside_bundler_dirs_are_not_fingerprinted():
+    assert not is_fingerprinted("main.3f2a1c8e.js")
+    assert not is_fingerprinted("img/index-B3x_9aQz.js")
+
+
+def _write(root, rel_path, content=""):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_vite_manifest_lists_emitted_files(tmp_path):
+    _write(tmp_path, ".vite/manifest.json", json.dumps({
+        "index.html": {"file": "js/index-DiwrgTda.js", "css": ["css/index-Ck2fLq8w.css"]},
+    }))
+    assets = load_manifest_assets(str(tmp_path))
+
+    assert assets == {"js/index-DiwrgTda.js", "css/index-Ck2fLq8w.css"}
+    assert is_fingerprinted("js/index-DiwrgTda.js", assets)
+    assert not is_fingerprinted("fonts/OpenSans-SemiBold.ttf", assets)
+
+
+def test_pwa_manifest_is_not_a_build_manifest(tmp_path):
+    _write(tmp_path, "manifest.json", json.dumps({"name": "App", "icons": []}))
+    assert load_manifest_assets(str(tmp_path)) is None
+
+
+def test_cra_manifest_paths_are_relative(tmp_path):
+    _write(tmp_path, "asset-manifest.json", json.dumps({
+        "files": {"main.js": "/static/js/main.3f2a1c8e.js", "index.html": "/index.html"},
+    }))
+    assets = load_manifest_assets(str(tmp_path))
+
+    assert is_fingerprinted("static/js/main.3f2a1c8e.js", assets)
+    assert not is_fingerprinted("index.html", assets)
+
+
+def test_scan_only_marks_bundler_output_immutable(tmp_path):
+    for rel_path in [
+        "index.html",
+        "fonts/OpenSans-SemiBold.ttf",
+        "Inter-Variable.woff2",
+        "docs/report-20240101.pdf",
+        "img/photo-IMG_1234.jpg",
+        "static/js/main.3f2a1c8e.js",
+        "static/css/main.9c1d2e3f.css",
+        "static/media/logo.png",
+    ]:
+        _write(tmp_path, rel_path)
+
+    result = scan_fingerprinted_assets(str(tmp_path))
+
+    assert result == {
+        "dirs": ["/static/css/", "/static/js/"],
+        "files": [],
+    }
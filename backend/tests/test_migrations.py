@@ -0,0 +1,71 @@
+"""
+Tests for schema upgrades of existing databases
+"""
+import pytest
+from sqlalchemy import create_engine, inspect, select
+
+from app.db import models
+from app.db.migrations import upgrade_schema
+
+
+@pytest.fixture
+def engine():
+    """Database created before project names were unique"""
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX uq_projects_name")
+        connection.exec_driver_sql("CREATE INDEX ix_projects_name ON projects (name)")
+        connection.execute(models.User.__table__.insert(), [
+            {"id": 1, "email": "a@example.com", "hashed_password": "x"},
+            {"id": 2, "email": "b@example.com", "hashed_password": "x"},
+        ])
+    yield engine
+    engine.dispose()
+
+
+def add_projects(engine, rows):
+    with engine.begin() as connection:
+        connection.execute(models.Project.__table__.insert(), [
+            {"id": project_id, "name": name, "owner_id": owner_id, "repo_url": "https://example.com/repo.git"}
+            for project_id, name, owner_id in rows
+        ])
+
+
+def test_keeps_newest_duplicate_and_creates_unique_index(engine):
+    add_projects(engine, [(1, "site", 1), (2, "blog", 1), (3, "site", 1), (4, "site", 1)])
+
+    upgrade_schema(engine)
+
+    projects = models.Project.__table__
+    with engine.connect() as connection:
+        rows = connection.execute(select(projects.c.id, projects.c.name).order_by(projects.c.id)).all()
+    assert [tuple(row) for row in rows] == [(2, "blog"), (4, "site")]
+    assert "uq_projects_name" in {index["name"] for index in inspect(engine).get_indexes("projects")}
+
+
+def test_names_shared_by_owners_are_renamed(engine):
+    add_projects(engine, [(1, "site", 1), (2, "site", 2), (3, "site-2", 1), (4, "blog", 2)])
+
+    upgrade_schema(engine)
+
+    projects = models.Project.__table__
+    with engine.connect() as connection:
+        rows = connection.execute(select(projects.c.id, projects.c.name).order_by(projects.c.id)).all()
+    # The oldest project keeps the name, others get an owner suffix that does not collide
+    assert [tuple(row) for row in rows] == [(1, "site"), (2, "site-2-2"), (3, "site-2"), (4, "blog")]
+
+
+def test_redundant_name_index_is_dropped(engine):
+    upgrade_schema(engine)
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("projects")}
+    assert "uq_projects_name" in indexes
+    assert "ix_projects_name" not in indexes
+
+
+def test_upgrade_is_idempotent(engine):
+    add_projects(engine, [(1, "site", 1)])
+
+    upgrade_schema(engine)
+    upgrade_schema(engine)
@@ -0,0 +1,75 @@
+"""
+Tests for the nginx config of static sites
+"""
+import re
+
+import pytest
+
+from app.core.config import settings
+from app.services.deployment_service import DeploymentService
+
+REVALIDATE_LATER = f"public, max-age={settings.STATIC_ASSET_MAX_AGE}"
+
+LOCATION_RE = re.compile(r'location\s+(=|\^~|~\*)?\s*"?([^"\s{]+)"?\s*\{(.*?)\n    \}', re.S)
+
+
+def parse_locations(config: str) -> list:
+    return [
+        {
+            "modifier": modifier,
+            "path": path,
+            "cache_control": re.search(r'Cache-Control "([^"]+)"', body).group(1),
+            "try_files": (re.search(r"try_files ([^;]+);", body) or [None, None])[1],
+        }
+        for modifier, path, body in LOCATION_RE.findall(config)
+    ]
+
+
+def match_location(locations: list, uri: str) -> dict:
+    """Pick the location nginx would use for a URI"""
+    for location in locations:
+        if location["modifier"] == "=" and location["path"] == uri:
+            return location
+
+    prefixes = [
+        location for location in locations
+        if location["modifier"] in ("", "^~") and uri.startswith(location["path"])
+    ]
+    longest = max(prefixes, key=lambda location: len(location["path"]), default=None)
+    if longest and longest["modifier"] == "^~":
+        return longest
+
+    for location in locations:
+        if location["modifier"] == "~*" and re.search(location["path"].replace("\\\\", "\\"), uri, re.I):
+            return location
+    return longest
+
+
+@pytest.fixture
+def locations():
+    config = DeploymentService._render_nginx_static(
+        "site", {"dirs": ["/assets/"], "files": ["/sw-3f2a1c8e.js"]}
+    )
+    return parse_locations(config)
+
+
+def test_spa_fallback_is_revalidated(locations):
+    """Deep links must not serve cached HTML pointing at deleted bundles"""
+    fallback = match_location(locations, "/dashboard/settings")
+    fallback_uri = fallback["try_files"].split()[-1]
+
+    # Only a URI as the last argument makes nginx redirect to another location
+    assert fallback_uri == "/index.html"
+    assert match_location(locations, fallback_uri)["cache_control"] == "no-cache"
+
+
+@pytest.mark.parametrize("uri, cache_control", [
+    ("/", REVALIDATE_LATER),
+    ("/favicon.ico", REVALIDATE_LATER),
+    ("/index.html", "no-cache"),
+    ("/about.htm", "no-cache"),
+    ("/assets/index-B3x_9aQz.js", "public, max-age=31536000, immutable"),
+    ("/sw-3f2a1c8e.js", "public, max-age=31536000, immutable"),
+])
+def test_cache_headers(locations, uri, cache_control):
+    assert match_location(locations, uri)["cache_control"] == cache_control
@@ -0,0 +1,137 @@
+"""
+Tests for restoring Next.js containers at startup
+"""
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.services import runtime_service
+from app.services.runtime_service import RUNTIME_NETWORK, RestoreProgress, restore_runtime_containers
+
+
+class FakeNetwork:
+    id = "current-network"
+
+    def connect(self, container):
+        pass
+
+    def disconnect(self, container, force=False):
+        pass
+
+
+class FakeContainer:
+    """Sparse container listing entry that records when it is started"""
+
+    def __init__(self, client, project, status="exited", fail=False):
+        self.project = project
+        self.client = client
+        self.status = status
+        self.fail = fail
+        self.attrs = {
+            "Names": [f"/nextjs-{project}"],
+            "NetworkSettings": {"Networks": {RUNTIME_NETWORK: {"NetworkID": FakeNetwork.id}}},
+        }
+
+    def start(self):
+        self.client.record_start(self.project)
+        if self.fail:
+            raise RuntimeError("port is already allocated")
+
+
+class FakeContainers:
+    def __init__(self, client):
+        self.client = client
+
+    def list(self, **kwargs):
+        return list(self.client.listed)
+
+
+class FakeNetworks:
+    def get(self, name):
+        return FakeNetwork()
+
+
+class FakeDockerClient:
+    """Just enough of docker-py for restore_runtime_containers"""
+
+    def __init__(self, start_delay=0.0):
+        self.start_delay = start_delay
+        self.listed = []
+        self.start_order = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self.containers = FakeContainers(self)
+        self.networks = FakeNetworks()
+
+    def add(self, project, **kwargs):
+        self.listed.append(FakeContainer(self, project, **kwargs))
+
+    def record_start(self, project):
+        with self._lock:
+            self.start_order.append(project)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.start_delay)
+        with self._lock:
+            self.active -= 1
+
+
+@pytest.fixture
+def activity(monkeypatch):
+    """Replace the database lookup of last activity per project"""
+    projects = {}
+    monkeypatch.setattr(runtime_service, "_recent_activity", lambda: projects)
+    return projects
+
+
+def test_restores_most_recently_deployed_first(activity):
+    activity.update({
+        "old": datetime(2024, 1, 1),
+        "newest": datetime(2024, 3, 1),
+        "middle": datetime(2024, 2, 1),
+    })
+    client = FakeDockerClient()
+    for project in ["old", "unknown", "newest", "middle"]:
+        client.add(project)
+
+    restore_runtime_containers(client=client, max_workers=1, progress=RestoreProgress())
+
+    # Projects without a database row have no activity and go last
+    assert client.start_order == ["newest", "middle", "old", "unknown"]
+
+
+def test_failures_are_counted(activity):
+    client = FakeDockerClient()
+    client.add("ok")
+    client.add("broken", fail=True)
+    client.add("running", status="running")
+    progress = RestoreProgress()
+
+    restore_runtime_containers(client=client, max_workers=2, progress=progress)
+
+    snapshot = progress.snapshot()
+    assert snapshot["total"] == 3
+    assert snapshot["completed"] == 3
+    assert snapshot["started"] == 1
+    assert snapshot["already_running"] == 1
+    assert snapshot["failed"] == 1
+    assert snapshot["in_progress"] == 0
+    assert snapshot["done"]
+    assert snapshot["error"] is None
+    # Already running containers are not started again
+    assert "running" not in client.start_order
+
+
+def test_pool_size_is_respected(activity):
+    client = FakeDockerClient(start_delay=0.05)
+    for index in range(8):
+        client.add(f"project-{index}")
+    progress = RestoreProgress()
+
+    restore_runtime_containers(client=client, max_workers=3, progress=progress)
+
+    assert client.max_active == 3
+    assert progress.snapshot()["started"] == 8
@@ -0,0 +1,44 @@
+"""
+Tests for Next.js static export detection
+"""
+import json
+
+import pytest
+
+from app.services.deployment_service import DeploymentService
+
+
+def write_project(tmp_path, config: str, build_script: str = "next build"):
+    (tmp_path / "next.config.js").write_text(config)
+    (tmp_path / "package.json").write_text(json.dumps({"scripts": {"build": build_script}}))
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize("config", [
+    "module.exports = { output: 'export' }",
+    'const nextConfig = {\n  output: "export",\n  images: { unoptimized: true },\n}',
+    "export default { output: `export` } // static hosting",
+    "module.exports = { basePath: '/docs', output: 'export' }",
+])
+def test_export_config_is_detected(tmp_path, config):
+    assert DeploymentService()._is_static_export(write_project(tmp_path, config))
+
+
+@pytest.mark.parametrize("config", [
+    "module.exports = {\n  // output: 'export',\n}",
+    "module.exports = {\n  /* output: 'export', */\n  reactStrictMode: true,\n}",
+    "/*\n * Set output: 'export' for static hosting\n */\nmodule.exports = {}",
+    "module.exports = { output: 'standalone' }",
+])
+def test_commented_or_other_output_is_not_an_export(tmp_path, config):
+    assert not DeploymentService()._is_static_export(write_project(tmp_path, config))
+
+
+def test_urls_in_strings_are_not_comments(tmp_path):
+    config = "module.exports = { assetPrefix: 'https://cdn.example.com', output: 'export' }"
+    assert DeploymentService()._is_static_export(write_project(tmp_path, config))
+
+
+def test_next_export_script_is_detected(tmp_path):
+    work_dir = write_project(tmp_path, "module.exports = {}", "next build && next export")
+    assert DeploymentService()._is_static_export(work_dir)